@@ -1,41 +1,19 @@
-import numpy as np 
-import random
+import numpy as np
 
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-
-def random_state():
-    a = np.random.randn() + 1j*np.random.randn()
-    b = np.random.randn() + 1j*np.random.randn()
-    vec = np.array([a, b], dtype=complex)
-    print(vec)
-    vec = vec / np.linalg.norm(vec)
-    return vec
-
-def measure_z(state):
-    prob_up = np.abs(np.vdot(Z_plus, state))**2
-    prob_down = np.abs(np.vdot(Z_minus, state))**2
-    
-    print(f" Probabilities: Up = {prob_up:.2f}, Down = {prob_down:.2f}, Total = {prob_up+prob_down:.2f}")
-    
-    if random.random() < prob_up:
-        return Z_plus, "up"
-    else:
-        return Z_minus, "down"
-    
+from spin_engine import Z_minus, Z_plus, measure, random_state
 
 N = 1
 up_count = 0
 down_count = 0
 for i in range(N):
     psi = random_state()
-    a = psi[0]
-    b = psi[1]
-    
-    #print(f"||ψ⟩ = ({a:.2f})|1⟩ + ({b:.2f})|2⟩")
-    
-    _, outcome = measure_z(psi)
-    #print("Measurement result: ", outcome)
+    print(psi)
+
+    prob_up = np.abs(np.vdot(Z_plus, psi))**2
+    prob_down = np.abs(np.vdot(Z_minus, psi))**2
+    print(f" Probabilities: Up = {prob_up:.2f}, Down = {prob_down:.2f}, Total = {prob_up+prob_down:.2f}")
+
+    _, outcome = measure(psi, "z")
     if outcome == "up":
         up_count += 1
     else:
@@ -43,6 +21,3 @@ for i in range(N):
     
 print("Z-up:", up_count)
 print("Z-down", down_count)
-
-
-
@@ -0,0 +1,244 @@
+# admission.py – cost-based admission control for simulation requests
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from itertools import count
+
+from spin_engine import AXES, filter_level
+from spin_j import dimension
+
+# Costs are in "atom-measurements": one atom through one fixed-axis analyzer.
+# The weights below were measured with benchmark.py against that unit.
+ANGLED_AXIS_WEIGHT = 1.15   # θ / θφ analyzers (basis lookup by angle)
+FORGET_WEIGHT = 1.3         # drawing a fresh random state between analyzers
+FILTER_PASS = 0.5           # share of a random beam that survives a filter
+CLOSED_FORM_COST = 1_000    # per analyzer, multinomial / ensemble modes
+SWEEP_POINT_COST = 80       # per analyzer and θ × φ grid point
+
+# Kernel throughput assumed until real requests have been timed
+DEFAULT_THROUGHPUT = 15e6   # atom-measurements per second
+THROUGHPUT_MIN_COST = 100_000
+
+
+def axis_weight(axis: str) -> float:
+    up, _ = AXES.get(axis, (None, None))
+    return ANGLED_AXIS_WEIGHT if callable(up) else 1.0
+
+
+def estimate_cost(analyzers: list, atoms: int, mode: str = "batch", spin: float = 0.5,
+                  forget: bool = False) -> float:
+    """Expected work of one /measurements request in atom-measurements."""
+    try:
+        levels = dimension(spin)
+    except ValueError:
+        return 0.0
+    if mode != "batch":
+        # Closed-form modes do (2j+1)-square state algebra (multinomial) or build
+        # (2j+1)-cubed projector stacks (ensemble) per analyzer; 1 at spin 1/2
+        scale = (levels / 2) ** (3 if mode == "ensemble" else 2)
+        return CLOSED_FORM_COST * max(len(analyzers), 1) * scale
+    # Spin-j kernels work on (2j + 1)-level states
+    per_level = 1.0 if levels == 2 else levels / 2
+
+    beam = 1.0
+    per_atom = 0.0
+    for i, an in enumerate(analyzers):
+        per_atom += beam * axis_weight(an.axis)
+        if filter_level(an.filter) is not None:
+            beam *= FILTER_PASS
+        if forget and i < len(analyzers) - 1:
+            per_atom += beam * FORGET_WEIGHT
+    return max(atoms, 0) * per_atom * per_level
+
+
+def estimate_sweep_cost(analyzers: list, points: int) -> float:
+    return SWEEP_POINT_COST * points * max(len(analyzers), 1)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted.
+
+    `status` is 429 when the queue is already full (back off before
+    retrying), 503 when the request waited `max_wait` without fitting and
+    413 when it costs more than any one request may (retrying will not help).
+    `retry_after` is the estimated seconds until there is room, None for 413.
+    """
+
+    def __init__(self, status: int, retry_after: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("charge", "client", "enqueued", "seq", "admitted", "waiter")
+
+    def __init__(self, charge: float, client: str, seq: int, waiter=None):
+        self.charge = charge
+        self.client = client
+        self.enqueued = time.monotonic()
+        self.seq = seq
+        self.admitted = False
+        self.waiter = waiter   # (event loop, future) for acquire_async
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """Admit simulations while their summed cost fits a per-process budget.
+
+    Requests that do not fit wait in a queue. Clients (origins / IPs) take
+    turns round-robin, so one busy client cannot starve the others; within
+    a client's turn its cheapest request runs first, and a waiting request's
+    priority improves with the time it has waited, so long requests are not
+    starved either. A request costing more than `max_cost` (by default the
+    whole budget) is refused outright: admitting it would have it run alone
+    and turn everyone else away for as long as it takes. Requests wait on
+    the event loop (acquire_async); release() may be called from any thread.
+    """
+
+    def __init__(self, budget: float, max_queue: int = 64, max_wait: float = 10.0,
+                 max_cost: float = None):
+        self.budget = budget
+        self.max_cost = budget if max_cost is None else max_cost
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.throughput = DEFAULT_THROUGHPUT
+        self.admitted = 0
+        self.rejected = 0
+        self._in_flight = 0.0
+        self._waiting = []
+        self._turns = deque()   # clients with waiting requests, next turn first
+        self._seq = count()
+        self._lock = threading.Lock()
+
+    def _priority(self, ticket: _Ticket, now: float):
+        # One max_wait of waiting is worth one full budget of cost
+        return ticket.charge / self.budget - (now - ticket.enqueued) / self.max_wait, ticket.seq
+
+    def _next_ticket(self, now: float):
+        # Best request of the client whose turn it is
+        while self._turns:
+            client = self._turns[0]
+            tickets = [t for t in self._waiting if t.client == client]
+            if tickets:
+                return min(tickets, key=lambda t: self._priority(t, now))
+            self._turns.popleft()
+        return None
+
+    def _schedule(self):
+        now = time.monotonic()
+        # Strict head-of-line: once the request whose turn it is does not
+        # fit, nothing behind it may overtake it
+        while self._waiting:
+            ticket = self._next_ticket(now)
+            if self._in_flight + ticket.charge > self.budget:
+                break
+            self._waiting.remove(ticket)
+            ticket.admitted = True
+            self._in_flight += ticket.charge
+            self.admitted += 1
+            if ticket.waiter is not None:
+                loop, future = ticket.waiter
+                loop.call_soon_threadsafe(_wake, future)
+            # The client goes to the back of the line
+            self._turns.rotate(-1)
+
+    def retry_after(self, charge: float = 0.0) -> int:
+        """Seconds until work in flight and queued (plus `charge`) should have drained."""
+        backlog = self._in_flight + sum(t.charge for t in self._waiting) + charge
+        return max(1, math.ceil(backlog / self.throughput))
+
+    def _enqueue(self, charge: float, client: str, waiter=None):
+        # Caller holds the lock. Returns None when admitted at once, else the queued ticket
+        if not self._waiting and self._in_flight + charge <= self.budget:
+            self._in_flight += charge
+            self.admitted += 1
+            return None
+        if len(self._waiting) >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(429, self.retry_after(charge), "Too many queued simulations")
+
+        ticket = _Ticket(charge, client, next(self._seq), waiter)
+        self._waiting.append(ticket)
+        if client not in self._turns:
+            self._turns.append(client)
+        self._schedule()
+        return ticket
+
+    def _charge(self, cost: float) -> float:
+        if cost > self.max_cost:
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(413, None, "Simulation is too large for one request; "
+                                        "split it up or submit it to POST /jobs")
+        # Only reachable when max_cost is raised above the budget: it runs alone
+        return min(max(cost, 0.0), self.budget)
+
+    def _expire(self, ticket: _Ticket):
+        # Caller holds the lock
+        self._waiting.remove(ticket)
+        self._schedule()
+        self.rejected += 1
+        raise Overloaded(503, self.retry_after(ticket.charge), "Simulation capacity exhausted")
+
+    async def acquire_async(self, cost: float, client: str = "") -> float:
+        """Wait on the event loop until `cost` fits the budget; returns the charge to release.
+
+        The wait does not tie up a worker thread.
+        """
+        charge = self._charge(cost)
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+        with self._lock:
+            ticket = self._enqueue(charge, client, (loop, admitted))
+            if ticket is None or ticket.admitted:
+                return charge
+        try:
+            await asyncio.wait_for(admitted, ticket.enqueued + self.max_wait - time.monotonic())
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not ticket.admitted:
+                    self._expire(ticket)
+        except asyncio.CancelledError:
+            # The client went away: hand back its place in the queue or its charge
+            with self._lock:
+                if ticket.admitted:
+                    self._in_flight = max(self._in_flight - charge, 0.0)
+                    self._schedule()
+                elif ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._schedule()
+            raise
+        return charge
+
+    def release(self, charge: float, cost: float = 0.0, seconds: float = 0.0):
+        """Hand back `charge`; `cost` / `seconds` time work that ran to completion.
+
+        Leave them out for failed or cancelled work: its cost was never
+        simulated, so it would inflate the throughput estimate.
+        """
+        with self._lock:
+            self._in_flight = max(self._in_flight - charge, 0.0)
+            # Smoothed kernel throughput, used for Retry-After estimates;
+            # tiny requests are dominated by overhead and would skew it
+            if cost >= THROUGHPUT_MIN_COST and seconds > 0:
+                self.throughput = 0.8 * self.throughput + 0.2 * (cost / seconds)
+            self._schedule()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "max_cost": self.max_cost,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiting),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "throughput": self.throughput,
+            }
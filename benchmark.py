@@ -0,0 +1,254 @@
+# benchmark.py – timings for the simulation kernels and the HTTP endpoints
+#
+#   python benchmark.py --output baseline.json          # record a baseline
+#   python benchmark.py --compare baseline.json         # flag regressions
+#   python benchmark.py --quick --only run_measurements  # smaller grid, one group
+#
+# Every case is timed with timeit (best of --repeat runs, each long enough to
+# be measurable) and stored under a stable id such as
+# "run_measurements[atoms=100000,analyzers=5,filter=up,forget=False]", so two
+# result files can be compared case by case.
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+import spin_engine
+from spin_engine import measure, random_state, theta_plus
+
+ATOMS = [10**3, 10**4, 10**5, 10**6, 10**7]
+QUICK_ATOMS = [10**3, 10**4, 10**5]
+CHAIN_LENGTHS = [1, 2, 5, 10]
+FILTERS = ["both", "up"]
+FORGET = [False, True]
+
+# A case is a regression once it runs this much slower than the baseline
+DEFAULT_THRESHOLD = 0.20
+
+# Time the server, not the per-client rate limit (read when stage1V2 is imported)
+os.environ.setdefault("SPIN_CLIENT_RATE", "0")
+
+
+def case_id(name: str, params: dict) -> str:
+    if not params:
+        return name
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def time_call(fn, repeat: int, min_time: float):
+    """(best, median, calls per run) for fn(), looping each run to at least min_time."""
+    timer = timeit.Timer(fn)
+    number = 1
+    elapsed = timer.timeit(number)
+    if elapsed < min_time:
+        number = int(min_time / max(elapsed, 1e-7)) + 1
+        elapsed = timer.timeit(number)
+    runs = [elapsed] + timer.repeat(repeat - 1, number)
+    per_call = [t / number for t in runs]
+    return min(per_call), statistics.median(per_call), number
+
+
+def chain(length: int, filt: str):
+    """Analyzers cycling through z, x, y and θφ; the first one carries the filter."""
+    analyzers = []
+    for i in range(length):
+        axis = ["z", "x", "y", "θφ"][i % 4]
+        an = {"axis": axis, "filter": filt if i == 0 else "both"}
+        if axis == "θφ":
+            an.update(theta=35.0, phi=20.0)
+        analyzers.append(an)
+    return analyzers
+
+
+# --- Cases --- #
+def kernel_cases(args):
+    state = random_state()
+    yield "measure", {"axis": "z"}, lambda: measure(state, "z")
+    yield "measure", {"axis": "θφ"}, lambda: measure(state, "θφ", 35.0, 20.0)
+    yield "random_state", {}, random_state
+    yield "theta_plus", {}, lambda: theta_plus(35.0, 20.0)
+    yield "analyzer_basis", {"axis": "θφ"}, lambda: spin_engine.analyzer_basis("θφ", 35.0, 20.0)
+
+
+def measurement_cases(args):
+    import stage1V2
+
+    # The endpoint is a coroutine (it waits for admission on the event loop)
+    loop = asyncio.new_event_loop()
+
+    def measure(req):
+        return lambda: loop.run_until_complete(stage1V2.run_measurements(req, None))
+
+    try:
+        for atoms in args.atoms:
+            for length in CHAIN_LENGTHS:
+                for filt in FILTERS:
+                    for forget in FORGET:
+                        req = stage1V2.MeasurementRequest(
+                            analyzers=chain(length, filt), atoms=atoms, forget=forget)
+                        params = {"atoms": atoms, "analyzers": length, "filter": filt,
+                                  "forget": forget}
+                        # Unseeded requests always recompute (no result cache)
+                        yield "run_measurements", params, measure(req)
+
+        for atoms in args.atoms:
+            for mode in ("multinomial", "ensemble"):
+                req = stage1V2.MeasurementRequest(analyzers=chain(5, "up"), atoms=atoms, mode=mode)
+                yield "run_measurements", {"atoms": atoms, "analyzers": 5, "mode": mode}, \
+                    measure(req)
+    finally:
+        loop.close()
+
+
+def http_cases(args):
+    try:
+        import httpx
+    except ImportError:
+        print("httpx is not installed; skipping the HTTP cases", file=sys.stderr)
+        return
+    from main import app
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+    def post(path: str, body: dict):
+        def call():
+            response = loop.run_until_complete(client.post(path, json=body))
+            response.raise_for_status()
+        return call
+
+    try:
+        for atoms in [a for a in args.atoms if a <= 10**6]:
+            body = {"analyzers": chain(3, "up"), "atoms": atoms}
+            yield "POST /measurements", {"atoms": atoms, "analyzers": 3}, post("/measurements", body)
+        body = {"analyzers": chain(3, "up"), "atoms": 10**6, "mode": "multinomial"}
+        yield "POST /measurements", {"atoms": 10**6, "analyzers": 3, "mode": "multinomial"}, \
+            post("/measurements", body)
+        body = {"analyzers": chain(2, "up"), "atoms": 10**4, "sweep": 1,
+                "theta_steps": 91, "phi_stop": 360, "phi_steps": 91}
+        yield "POST /sweep", {"grid": "91x91"}, post("/sweep", body)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+
+GROUPS = {
+    "kernel": kernel_cases,
+    "run_measurements": measurement_cases,
+    "http": http_cases,
+}
+
+
+def run(args):
+    results = {}
+    for group in args.only or GROUPS:
+        for name, params, fn in GROUPS[group](args):
+            key = case_id(name, params)
+            best, median, number = time_call(fn, args.repeat, args.min_time)
+            results[key] = {
+                "group": group,
+                "name": name,
+                "params": params,
+                "seconds": best,
+                "median": median,
+                "number": number,
+                "repeat": args.repeat,
+            }
+            print(f"{key:<72} {format_seconds(best):>10}", flush=True)
+    return results
+
+
+def metadata():
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "backend": os.environ.get("SPIN_BACKEND", "state"),
+    }
+
+
+# --- Comparison --- #
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Print the per-case change against `baseline`; returns the regressed ids."""
+    regressions = []
+    print(f"\n{'case':<72} {'baseline':>10} {'current':>10} {'change':>8}")
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<72} {'-':>10} {format_seconds(result['seconds']):>10} {'new':>8}")
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{key:<72} {format_seconds(base['seconds']):>10} "
+              f"{format_seconds(result['seconds']):>10} {ratio - 1:>+8.1%}{flag}")
+    missing = [key for key in baseline if key not in results]
+    if missing:
+        print(f"\n{len(missing)} baseline case(s) were not run")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time the simulation kernels and endpoints, optionally against a baseline.")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare against a JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown counted as a regression (default 0.20 = 20%%)")
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS), help="run only these groups")
+    parser.add_argument("--quick", action="store_true", help="atoms up to 1e5 only")
+    parser.add_argument("--atoms", type=int, nargs="+", help="override the atom counts")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds per timed run (calls are looped to reach it)")
+    args = parser.parse_args(argv)
+    if args.atoms is None:
+        args.atoms = QUICK_ATOMS if args.quick else ATOMS
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    try:
+        results = run(args)
+    finally:
+        # Large batch requests start the worker pool; don't leave it behind
+        if "stage1V2" in sys.modules:
+            sys.modules["stage1V2"].job_manager.shutdown()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"meta": metadata(), "results": results}, f, indent=2, ensure_ascii=False)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
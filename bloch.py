@@ -0,0 +1,195 @@
+# bloch.py – spin-1/2 chain kernels on real Bloch vectors instead of complex amplitudes
+import numpy as np
+
+from spin_engine import CHUNK_SIZE, ChainPlan, chain_plan
+
+# A spin-1/2 state is fully described by its Bloch vector r (a real unit
+# 3-vector). Measuring along n gives "up" with P = (1 + n·r) / 2 and leaves
+# the atom in r = ±n, so a measurement is one dot product and a collapse is
+# a choice between two fixed vectors; atoms that passed a filter all share
+# one vector and are stored as a broadcast view of it.
+
+
+def bloch_vector(state: np.ndarray) -> np.ndarray:
+    """Bloch vector(s) (x, y, z) of normalized state(s) (a, b); works on (2,) or (n, 2)."""
+    a, b = state[..., 0], state[..., 1]
+    cross = np.conj(a) * b
+    return np.stack([2 * cross.real, 2 * cross.imag, np.abs(a)**2 - np.abs(b)**2], axis=-1)
+
+
+def random_vectors(n: int, rng: np.random.Generator) -> np.ndarray:
+    """n Bloch vectors uniform on the sphere, as an (n, 3) array."""
+    u = rng.random((n, 2))
+    z = 1 - 2 * u[:, 0]
+    rho = np.sqrt(1 - z * z)
+    phi = 2 * np.pi * u[:, 1]
+    return np.stack([rho * np.cos(phi), rho * np.sin(phi), z], axis=1)
+
+
+def plan_axes(plan: ChainPlan) -> np.ndarray:
+    """(analyzers, 3) Bloch vectors of each analyzer's "up" state."""
+    return np.array([bloch_vector(up) for up, _ in plan.bases]).reshape(len(plan.bases), 3)
+
+
+def run_bloch_batch(vectors: np.ndarray, plan: ChainPlan, axes: np.ndarray,
+                    counts: np.ndarray, rng: np.random.Generator):
+    """spin_engine.run_chain_batch on (n, 3) Bloch vectors; tallies go into `counts` in place."""
+    for i in range(plan.stop):
+        if len(vectors) == 0:
+            break
+
+        n = axes[i]
+        is_up = 2 * rng.random(len(vectors)) < 1 + vectors @ n
+
+        keep_up, keep_down = plan.keep[i]
+        if keep_up and keep_down:
+            n_up = int(np.count_nonzero(is_up))
+            counts[i, 0] += n_up
+            counts[i, 1] += len(is_up) - n_up
+            vectors = np.where(is_up[:, None], n, -n)
+        elif keep_up or keep_down:
+            passed = int(np.count_nonzero(is_up if keep_up else ~is_up))
+            counts[i, 0 if keep_up else 1] += passed
+            # Every atom that got through sits in the same state
+            vectors = np.broadcast_to(n if keep_up else -n, (passed, 3))
+        else:
+            break
+
+        if plan.resets[i]:
+            vectors = random_vectors(len(vectors), rng)
+
+    return counts
+
+
+def iter_bloch_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                     forget=False, chunk_size: int = CHUNK_SIZE,
+                     rng: np.random.Generator = None):
+    """spin_engine.iter_chain on the Bloch-vector kernel (same yields, different draws)."""
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    axes = plan_axes(plan)
+    start = None if state is None else bloch_vector(np.asarray(state, dtype=complex))
+    tallies = np.zeros((len(analyzers), 2), dtype=np.int64)
+    counts = [{"up": 0, "down": 0} for _ in analyzers]
+
+    done = 0
+    while done < atoms:
+        n = min(chunk_size, atoms - done)
+        if start is None:
+            vectors = random_vectors(n, rng)
+        else:
+            vectors = np.broadcast_to(start, (n, 3))
+        run_bloch_batch(vectors, plan, axes, tallies, rng)
+        for tally, (up, down) in zip(counts, tallies.tolist()):
+            tally["up"], tally["down"] = up, down
+        done += n
+        yield done, counts
+
+
+# --- Per-atom outcomes and grouped runs --- #
+def run_bloch_outcomes(vectors: np.ndarray, plan: ChainPlan, axes: np.ndarray,
+                       rng: np.random.Generator) -> np.ndarray:
+    """run_bloch_batch keeping every atom's outcome, laid out as in
+    spin_engine.run_chain_outcomes; draws the same random numbers.
+    """
+    outcomes = np.zeros((len(plan.bases), len(vectors)), dtype=bool)
+    alive = np.arange(len(vectors))
+    for i in range(plan.stop):
+        if len(vectors) == 0:
+            break
+
+        n = axes[i]
+        is_up = 2 * rng.random(len(vectors)) < 1 + vectors @ n
+        outcomes[i, alive] = is_up
+
+        keep_up, keep_down = plan.keep[i]
+        if keep_up and keep_down:
+            vectors = np.where(is_up[:, None], n, -n)
+        elif keep_up or keep_down:
+            alive = alive[is_up if keep_up else ~is_up]
+            vectors = np.broadcast_to(n if keep_up else -n, (len(alive), 3))
+        else:
+            break
+
+        if plan.resets[i]:
+            vectors = random_vectors(len(vectors), rng)
+
+    return outcomes
+
+
+def iter_bloch_outcomes(analyzers: list, atoms: int, state: np.ndarray = None, forget=False,
+                        chunk_size: int = CHUNK_SIZE, rng: np.random.Generator = None):
+    """iter_bloch_chain's atoms, yielding each chunk's (analyzers, n) outcome array."""
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    axes = plan_axes(plan)
+    start = None if state is None else bloch_vector(np.asarray(state, dtype=complex))
+    done = 0
+    while done < atoms:
+        n = min(chunk_size, atoms - done)
+        if start is None:
+            vectors = random_vectors(n, rng)
+        else:
+            vectors = np.broadcast_to(start, (n, 3))
+        yield run_bloch_outcomes(vectors, plan, axes, rng)
+        done += n
+
+
+def run_bloch_group_batch(vectors: np.ndarray, owner: np.ndarray, plan: ChainPlan,
+                          axes: np.ndarray, counts: np.ndarray, rng: np.random.Generator):
+    """spin_engine.run_group_batch on Bloch vectors; `counts` is (analyzers, 2, requests)."""
+    n_owners = counts.shape[2]
+    for i in range(plan.stop):
+        if len(vectors) == 0:
+            break
+
+        n = axes[i]
+        is_up = 2 * rng.random(len(vectors)) < 1 + vectors @ n
+
+        keep_up, keep_down = plan.keep[i]
+        if keep_up and keep_down:
+            counts[i, 0] += np.bincount(owner[is_up], minlength=n_owners)
+            counts[i, 1] += np.bincount(owner[~is_up], minlength=n_owners)
+            vectors = np.where(is_up[:, None], n, -n)
+        elif keep_up or keep_down:
+            owner = owner[is_up if keep_up else ~is_up]
+            counts[i, 0 if keep_up else 1] += np.bincount(owner, minlength=n_owners)
+            vectors = np.broadcast_to(n if keep_up else -n, (len(owner), 3))
+        else:
+            break
+
+        if plan.resets[i]:
+            vectors = random_vectors(len(vectors), rng)
+
+    return counts
+
+
+def simulate_bloch_group(analyzers: list, atoms: list, states: list, forget: bool = False,
+                         chunk_size: int = CHUNK_SIZE, rng: np.random.Generator = None):
+    """spin_engine.simulate_group on the Bloch-vector kernel."""
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    axes = plan_axes(plan)
+    offsets = np.cumsum(atoms, dtype=np.int64)
+    total = int(offsets[-1]) if len(atoms) else 0
+    is_fixed = np.array([state is not None for state in states], dtype=bool)
+    fixed = np.array([bloch_vector(np.asarray(state, dtype=complex)) if state is not None
+                      else np.zeros(3) for state in states]).reshape(-1, 3)
+    counts = np.zeros((len(analyzers), 2, len(atoms)), dtype=np.int64)
+
+    for lo in range(0, total, chunk_size):
+        hi = min(lo + chunk_size, total)
+        owner = np.searchsorted(offsets, np.arange(lo, hi), side="right")
+        chunk = random_vectors(hi - lo, rng)
+        fixed_rows = is_fixed[owner]
+        if fixed_rows.any():
+            chunk[fixed_rows] = fixed[owner[fixed_rows]]
+        run_bloch_group_batch(chunk, owner, plan, axes, counts, rng)
+
+    return [
+        [{"up": int(counts[i, 0, r]), "down": int(counts[i, 1, r])} for i in range(len(analyzers))]
+        for r in range(len(atoms))
+    ]
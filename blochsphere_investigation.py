@@ -1,15 +1,4 @@
-import numpy as np
-
-# Use your definitions
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-
-def theta_plus(theta_deg, phi_deg):
-    θ = np.radians(theta_deg)
-    φ = np.radians(phi_deg)
-    return np.array([
-        np.cos(θ/2),
-        np.exp(1j * φ) * np.sin(θ/2)
-    ], dtype=complex)
+from spin_engine import Y_plus, theta_plus
 
 # choose some angles (they can be anything)
 theta = 140
@@ -20,8 +9,8 @@ T_plus = theta_plus(theta, phi)
 
 # manually compute the inner product (show algebra)
 # <n,+|y,+> = conj(T_plus[0])*Y_plus[0] + conj(T_plus[1])*Y_plus[1]
-term1 = np.conjugate(T_plus[0]) * Y_plus[0]
-term2 = np.conjugate(T_plus[1]) * Y_plus[1]
+term1 = T_plus[0].conjugate() * Y_plus[0]
+term2 = T_plus[1].conjugate() * Y_plus[1]
 
 print("Term 1 =", term1)
 print("Term 2 =", term2)
@@ -0,0 +1,119 @@
+# coalescer.py – micro-batching of concurrent requests and single-flight of identical ones
+import asyncio
+
+
+class _Group:
+    __slots__ = ("items", "full", "done", "task")
+
+    def __init__(self, loop):
+        self.items = []
+        self.full = asyncio.Event()
+        self.done = loop.create_future()   # the run's results, one per item
+        self.task = None
+
+
+class Coalescer:
+    """Runs compatible requests that arrive close together as one group.
+
+    `run(items)` is awaited with every item submitted under the same key
+    and returns one result per item, in order. A request that arrives while
+    nothing else is in flight runs straight away, so a quiet server adds no
+    latency; under load the first request for a key holds its group open
+    for up to `window` seconds (or until `max_size` items joined) and the
+    rest of the burst rides along.
+
+    For coroutines on one event loop, like SingleFlight: members wait
+    without holding a thread, and the group runs in its own task, so a
+    member that goes away does not take the others' results with it.
+    """
+
+    def __init__(self, run, window: float = 0.005, max_size: int = 64):
+        self.run = run
+        self.window = window
+        self.max_size = max_size
+        self.groups = 0
+        self.joined = 0
+        self._open = {}       # key -> group still taking members
+        self._in_flight = 0
+
+    async def _run_group(self, key, group: _Group, wait: float):
+        if wait > 0:
+            try:
+                await asyncio.wait_for(group.full.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            if self._open.get(key) is group:
+                del self._open[key]
+        try:
+            group.done.set_result(await self.run(group.items))
+        except Exception as exc:
+            group.done.set_exception(exc)
+
+    async def submit(self, key, item):
+        """Wait until the item's group has run; returns the item's result."""
+        group = self._open.get(key)
+        if group is None:
+            group = _Group(asyncio.get_running_loop())
+            self.groups += 1
+            wait = self.window if self._in_flight and self.max_size > 1 else 0
+            if wait > 0:
+                self._open[key] = group
+            group.task = asyncio.create_task(self._run_group(key, group, wait))
+        else:
+            self.joined += 1
+        index = len(group.items)
+        group.items.append(item)
+        if len(group.items) >= self.max_size and self._open.get(key) is group:
+            del self._open[key]
+            group.full.set()
+
+        self._in_flight += 1
+        try:
+            results = await asyncio.shield(group.done)
+        finally:
+            self._in_flight -= 1
+        return results[index]
+
+    def stats(self):
+        return {
+            "groups": self.groups,
+            "joined": self.joined,
+            "open": len(self._open),
+            "in_flight": self._in_flight,
+        }
+
+
+# Result a failed single-flight leader hands its followers
+_FAILED = object()
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share the first caller's result.
+
+    For coroutines on one event loop, so followers wait without holding a
+    thread. If the first caller fails (e.g. it was rate limited) the others
+    make the call themselves rather than inherit its error.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+
+    async def do(self, key, fn):
+        """Await fn() once per key among overlapping callers; returns its result."""
+        call = self._calls.get(key)
+        if call is not None:
+            result = await asyncio.shield(call)
+            if result is _FAILED:
+                return await fn()
+            self.shared += 1
+            return result
+
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        result = _FAILED
+        try:
+            result = await fn()
+            return result
+        finally:
+            del self._calls[key]
+            call.set_result(result)
@@ -1,58 +1,6 @@
-import numpy as np
-import random
 import tkinter as tk
 
-# Basis states
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-
-X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-
-def random_state():
-    a = np.random.randn() + 1j*np.random.randn()
-    b = np.random.randn() + 1j*np.random.randn()
-    vec = np.array([a, b], dtype=complex)
-    vec /= np.linalg.norm(vec)
-    return vec
-
-
-def measure_z(state):
-    prob_up = np.abs(np.vdot(Z_plus, state))**2
-    if random.random() < prob_up:
-        return Z_plus, "up"
-    else:
-        return Z_minus, "down"
-
-def measure_x(state):
-    prob_up = np.abs(np.vdot(X_plus, state))**2
-    if random.random() < prob_up:
-        return X_plus, "up"
-    else:
-        return X_minus, "down"
-
-def measure_y(state):
-    prob_up = np.abs(np.vdot(Y_plus, state))**2
-    if random.random() < prob_up:
-        return Y_plus, "up"
-    else:
-        return Y_minus, "down"
-
-
-def measure(state, axis):
-    """General measurement along chosen axis."""
-    if axis == "z":
-        return measure_z(state)
-    elif axis == "x":
-        return measure_x(state)
-    elif axis == "y":
-        return measure_y(state)
-    else:
-        raise ValueError("Invalid axis. Choose x, y, or z.")
+from spin_engine import Analyzer, simulate_chain
 
 
 def run_two_measurements():
@@ -65,26 +13,10 @@ def run_two_measurements():
         result_label.config(text="Please enter a valid number of atoms.")
         return
 
-    first_up = 0
-    first_down = 0
-    second_up = 0
-    second_down = 0 #these four set each state measurement to 0
-
-    for i in range(N): #for every index, i, in N we are going to:
-        psi = random_state() #generate a random state
-        collapsed_state, outcome1 = measure(psi, axis1) #Measure along first axis, collapsed state is now tied to outcome from measurement 1
-
-        if outcome1 == "up":
-            first_up += 1
-        else:
-            first_down += 1
-
-        if outcome1 == filter_choice: #if outcome of axis1 is the same as the filter choice, outcome passes through. Otherwise its blocked. 
-            _, outcome2 = measure(collapsed_state, axis2)  # Measure the same atom along the second axis; outcome2 is "up" or "down" based on quantum probabilities
-            if outcome2 == "up":
-                second_up += 1
-            else:
-                second_down += 1
+    # Atoms blocked by the first analyzer's filter never reach the second
+    analyzers = [Analyzer(axis1, filter_choice), Analyzer(axis2)]
+    second = simulate_chain(analyzers, N)[1]
+    second_up, second_down = second["up"], second["down"]
 
     result_label.config(
         text=f"Second measurement ({axis2.upper()})"
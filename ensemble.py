@@ -0,0 +1,78 @@
+# ensemble.py – density-matrix propagation of a whole beam through the analyzer chain
+import numpy as np
+
+from spin_engine import basis_cache
+from spin_j import chain_settings, dimension, level_labels
+
+
+def chain_projectors(analyzers: list, spin: float):
+    """Per analyzer, a (2j+1, 2j+1, 2j+1) stack of projectors |m><m| plus filter levels."""
+    bases, filters = chain_settings(analyzers, spin)
+    if dimension(spin) == 2:
+        # Spin 1/2 reuses the projector tables in the shared basis cache
+        projectors = []
+        for an in analyzers:
+            basis = basis_cache.get(an.axis, an.theta, an.phi)
+            projectors.append(np.stack([basis.up_projector, basis.down_projector]))
+    else:
+        projectors = [np.einsum("ak,bk->kab", basis, basis.conj()) for basis in bases]
+    return projectors, filters
+
+
+def ensemble_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                   forget: bool = False, rng: np.random.Generator = None,
+                   spin: float = 0.5):
+    """Propagate the beam's density matrix ρ through the chain.
+
+    An unpolarized beam starts as ρ = I / (2j+1) and a prepared one as
+    |ψ><ψ|. A "both" analyzer maps ρ to Σ P_m ρ P_m, a filter keeps one
+    P_m ρ P_m, and forget resets ρ to tr(ρ) I / (2j+1). The exact fraction
+    of atoms counted in each outcome of each analyzer is tr(P_m ρ).
+
+    Counts are drawn per branch: atoms that collapsed onto |m> at one
+    analyzer are split over the next analyzer's outcomes with one
+    multinomial draw, so no per-atom random states are generated.
+    Returns (counts, probabilities) as lists of dicts keyed by outcome.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    d = dimension(spin)
+    projectors, filters = chain_projectors(analyzers, spin)
+    mixed = np.eye(d, dtype=complex) / d
+    rho = mixed if state is None else np.outer(state, state.conj())
+
+    counts = np.zeros((len(analyzers), d), dtype=np.int64)
+    probs = np.zeros((len(analyzers), d))
+    branches = [(rho, atoms)]   # (normalized density matrix, atoms) per collapsed outcome
+    last = len(analyzers) - 1
+    for i, (P, level) in enumerate(zip(projectors, filters)):
+        if level == -1:
+            break
+
+        p = np.einsum("kab,ba->k", P, rho).real
+        landed = np.zeros(d, dtype=np.int64)
+        for branch, n in branches:
+            q = np.clip(np.einsum("kab,ba->k", P, branch).real, 0.0, None)
+            landed += rng.multinomial(n, q / q.sum())
+
+        # Apply filtering
+        if level is None:
+            rho = np.einsum("kab,bc,kcd->ad", P, rho, P)
+        else:
+            rho = P[level] @ rho @ P[level]
+            keep = np.arange(d) == level
+            p = np.where(keep, p, 0.0)
+            landed = np.where(keep, landed, 0)
+
+        counts[i] = landed
+        probs[i] = np.clip(p, 0.0, 1.0)
+        branches = [(P[k], int(n)) for k, n in enumerate(landed) if n]
+
+        # Optional randomization between analyzers
+        if forget and i < last:
+            rho = np.trace(rho).real * mixed
+            branches = [(mixed, int(landed.sum()))]
+
+    labels = level_labels(spin)
+    return ([dict(zip(labels, map(int, row))) for row in counts],
+            [dict(zip(labels, map(float, row))) for row in probs])
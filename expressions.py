@@ -0,0 +1,121 @@
+# expressions.py – safe parser for the calculator-style a, b amplitude inputs
+import ast
+import cmath
+import re
+from functools import lru_cache
+
+import numpy as np
+
+MAX_EXPRESSION_LENGTH = 200
+
+# Names and functions an amplitude expression may use
+NAMES = {
+    "i": 1j,
+    "j": 1j,
+    "pi": cmath.pi,
+    "π": cmath.pi,
+    "e": cmath.e,
+}
+
+FUNCTIONS = {
+    "sqrt": cmath.sqrt,
+    "exp": cmath.exp,
+    "cos": cmath.cos,
+    "sin": cmath.sin,
+}
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+
+# --- Calculator syntax to Python --- #
+def convert_expression(expr: str) -> str:
+    """Rewrite √, ^ and i-suffixed numbers as Python syntax."""
+    expr = expr.strip()
+    # Implicit multiplication before a root, e.g. 2√2 or (1+i)√(2)
+    expr = re.sub(r"([\d)])\s*√", r"\1*√", expr)
+    expr = re.sub(r"√\s*(\d+(?:\.\d*)?|[A-Za-zπ]+)", r"sqrt(\1)", expr)
+    expr = expr.replace("√", "sqrt")
+    expr = expr.replace("^", "**")
+    # 2i -> 2j; a bare i is looked up in NAMES
+    expr = re.sub(r"(\d)\s*i\b", r"\1j", expr)
+    expr = re.sub(r"\)\s*i\b", r")*i", expr)
+    return expr
+
+
+class _FloatConstants(ast.NodeTransformer):
+    # Integer powers like 9**9**9 would build huge ints; floats overflow fast
+    def visit_Constant(self, node):
+        if isinstance(node.value, int) and not isinstance(node.value, bool):
+            return ast.copy_location(ast.Constant(float(node.value)), node)
+        return node
+
+
+def _check_node(node: ast.AST):
+    if isinstance(node, ast.Expression):
+        _check_node(node.body)
+    elif isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex)):
+            raise ValueError(f"Unsupported constant {node.value!r}")
+    elif isinstance(node, ast.Name):
+        if node.id not in NAMES:
+            raise ValueError(f"Unknown name '{node.id}'")
+    elif isinstance(node, ast.BinOp):
+        if not isinstance(node.op, _BIN_OPS):
+            raise ValueError("Unsupported operator")
+        _check_node(node.left)
+        _check_node(node.right)
+    elif isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, _UNARY_OPS):
+            raise ValueError("Unsupported operator")
+        _check_node(node.operand)
+    elif isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ValueError("Unsupported function")
+        if len(node.args) != 1 or node.keywords:
+            raise ValueError(f"{node.func.id}() takes exactly one argument")
+        _check_node(node.args[0])
+    else:
+        raise ValueError("Unsupported expression")
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expr: str):
+    """Parse and whitelist an amplitude expression into a code object.
+
+    Raises ValueError for anything other than numbers, + - * / **,
+    the names in NAMES and one-argument calls to FUNCTIONS.
+    """
+    if not expr or len(expr) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("Expression is empty or too long")
+    try:
+        tree = ast.parse(convert_expression(expr), mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Invalid expression '{expr}'") from exc
+    _check_node(tree)
+    tree = ast.fix_missing_locations(_FloatConstants().visit(tree))
+    return compile(tree, "<amplitude>", "eval")
+
+
+def evaluate_expression(expr: str) -> complex:
+    """Evaluate an amplitude expression such as '1/√2' or 'e^(i*pi/4)/√(2)'."""
+    code = compile_expression(expr)
+    env = {"__builtins__": {}, **NAMES, **FUNCTIONS}
+    try:
+        return complex(eval(code, env))
+    except (ArithmeticError, ValueError, TypeError) as exc:
+        raise ValueError(f"Cannot evaluate '{expr}'") from exc
+
+
+def parse_amplitudes(exprs: list) -> np.ndarray:
+    """Normalized state vector from one amplitude expression per level."""
+    state = np.array([evaluate_expression(expr) for expr in exprs], dtype=complex)
+    norm = np.linalg.norm(state)
+    if not np.isfinite(norm) or norm == 0:
+        raise ValueError("Amplitudes must be finite and not all zero")
+    return state / norm
+
+
+def parse_state(a: str, b: str) -> np.ndarray:
+    """Normalized spin state a|+z> + b|-z> from two amplitude expressions."""
+    return parse_amplitudes([a, b])
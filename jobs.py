@@ -0,0 +1,127 @@
+# jobs.py – background simulation jobs on a process pool
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobManager:
+    """Runs CPU-bound simulations in worker processes and tracks their state.
+
+    `worker(payload, job_id, progress, cancelled)` must be a module-level
+    function. It runs in a child process, can report progress by writing
+    `progress[job_id]`, and should raise JobCancelled once
+    `cancelled.get(job_id)` is set. The pool and the manager process are
+    only started on first use.
+    """
+
+    def __init__(self, worker, max_workers: int = None, max_jobs: int = 1000):
+        self.worker = worker
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()   # job id -> {"future", "atoms"}
+        self._pool = None
+        self._manager = None
+        self._progress = None
+        self._cancelled = None
+
+    def _start(self):
+        if self._pool is None:
+            # Imported here to keep them out of the server's cold start
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            ctx = multiprocessing.get_context("spawn")
+            self._manager = ctx.Manager()
+            self._progress = self._manager.dict()
+            self._cancelled = self._manager.dict()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+
+    def submit(self, payload: dict, atoms: int = 0, on_done=None) -> str:
+        """Queue a job; `on_done()` is called once it finishes, fails or is cancelled."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._start()
+            future = self._pool.submit(self.worker, payload, job_id,
+                                       self._progress, self._cancelled)
+            self._jobs[job_id] = {"future": future, "atoms": atoms}
+            self._evict()
+        if on_done is not None:
+            future.add_done_callback(lambda _: on_done())
+        return job_id
+
+    def map(self, fn, items: list, max_workers: int = None):
+        """Yield fn(*item) for each item, in order, with at most max_workers in flight."""
+        limit = min(max_workers or self.max_workers, self.max_workers)
+        with self._lock:
+            self._start()
+            pool = self._pool
+        pending = deque()
+        for item in items:
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+            pending.append(pool.submit(fn, *item))
+        while pending:
+            yield pending.popleft().result()
+
+    def _evict(self):
+        # Drop the oldest finished jobs once more than max_jobs are tracked
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if self._jobs[job_id]["future"].done():
+                self._forget(job_id)
+
+    def _forget(self, job_id: str):
+        self._jobs.pop(job_id, None)
+        self._progress.pop(job_id, None)
+        self._cancelled.pop(job_id, None)
+
+    def status(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        future = job["future"]
+        info = {
+            "id": job_id,
+            "progress": {"atoms_done": self._progress.get(job_id, 0), "atoms": job["atoms"]},
+        }
+        if future.cancelled() or self._cancelled.get(job_id):
+            info["status"] = "cancelled"
+        elif not future.done():
+            info["status"] = "running" if future.running() else "queued"
+        elif future.exception() is not None:
+            info["status"] = "failed"
+            info["error"] = str(future.exception())
+        else:
+            info["status"] = "done"
+            info["progress"]["atoms_done"] = job["atoms"]
+            info["result"] = future.result()
+        return info
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            future = job["future"]
+            if not future.done():
+                # Pending jobs never start; running ones stop at the next chunk
+                if not future.cancel():
+                    self._cancelled[job_id] = True
+        return True
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._manager.shutdown()
+                self._pool = self._manager = None
+
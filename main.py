@@ -1,3 +1,5 @@
 # main.py – entry point for Render
-from stage1V2 import app
+from startup import profile
 
+with profile.phase("import"):
+    from stage1V2 import app
@@ -0,0 +1,255 @@
+# metrics.py – low-overhead Prometheus-style counters, gauges and histograms
+import math
+import threading
+import time
+from bisect import bisect_left
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# New label combinations past this many per metric are folded into "other"
+MAX_SERIES = 200
+
+
+class _Cells:
+    """Per-thread value slots that are summed when scraped.
+
+    Each thread only ever writes its own list, so updates never take a lock
+    or contend with other threads; the lock is only used the first time a
+    thread touches the series and when the totals are read.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _mine(self):
+        cells = getattr(self._local, "cells", None)
+        if cells is None:
+            cells = self._local.cells = [0] * self._size
+            with self._lock:
+                self._all.append(cells)
+        return cells
+
+    def totals(self):
+        with self._lock:
+            snapshot = list(self._all)
+        return [sum(cells[i] for cells in snapshot) for i in range(self._size)]
+
+
+class _CounterValue(_Cells):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1):
+        self._mine()[0] += amount
+
+    def samples(self, name: str):
+        yield name, (), self.totals()[0]
+
+
+class _GaugeValue(_CounterValue):
+    def dec(self, amount: float = 1):
+        self._mine()[0] -= amount
+
+
+class _HistogramValue(_Cells):
+    def __init__(self, buckets: tuple):
+        # One slot per bucket, one for +Inf and one for the running sum
+        super().__init__(len(buckets) + 2)
+        self._buckets = buckets
+
+    def observe(self, value: float):
+        cells = self._mine()
+        cells[bisect_left(self._buckets, value)] += 1
+        cells[-1] += value
+
+    def samples(self, name: str):
+        totals = self.totals()
+        cumulative = 0
+        for bound, n in zip(self._buckets + ("+Inf",), totals[:-1]):
+            cumulative += n
+            le = bound if isinstance(bound, str) else _format_value(bound)
+            yield name + "_bucket", (("le", le),), cumulative
+        yield name + "_sum", (), totals[-1]
+        yield name + "_count", (), cumulative
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        if not self.labelnames:
+            self._default = self.labels()
+        (registry or REGISTRY).register(self)
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        series = self._series.get(key)
+        if series is not None:
+            return series
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        with self._lock:
+            if key not in self._series and len(self._series) >= MAX_SERIES:
+                key = ("other",) * len(key)
+            return self._series.setdefault(key, self._new_value())
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            labels = tuple(zip(self.labelnames, key))
+            for name, extra, value in series.samples(self.name):
+                yield name, labels + extra, value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_value(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_value(self):
+        return _GaugeValue()
+
+    def inc(self, amount: float = 1):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._default.dec(amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (),
+                 buckets: tuple = LATENCY_BUCKETS, registry: "Registry" = None):
+        self.buckets = tuple(float(b) for b in sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+
+class Collected:
+    """A metric read from elsewhere at scrape time (e.g. cache statistics).
+
+    `collect()` returns {label values tuple: value}; use () for no labels.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, collect,
+                 labelnames: tuple = (), registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        (registry or REGISTRY).register(self)
+
+    def samples(self):
+        for key, value in self.collect().items():
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+# --- Exposition --- #
+def _format_value(value: float) -> str:
+    if not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All registered metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    pairs = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                    name = f"{name}{{{pairs}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# --- HTTP metrics --- #
+http_requests = Counter("spin_http_requests_total", "HTTP requests by route, method and status",
+                        ("route", "method", "status"))
+http_latency = Histogram("spin_http_request_duration_seconds",
+                         "Time from request to the last response byte, by route", ("route",))
+http_in_flight = Gauge("spin_http_requests_in_flight", "Requests currently being served")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route counts, latency and in-flight requests.
+
+    Routes are labelled by their path template (e.g. /jobs/{job_id}), so the
+    number of series stays bounded. Streaming responses are timed until the
+    last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_latency.labels(path).observe(elapsed)
+            http_requests.labels(path, scope["method"], status).inc()
@@ -0,0 +1,90 @@
+# rate_limit.py – cost-weighted token buckets per client (Origin or IP)
+import math
+import threading
+import time
+from collections import OrderedDict
+
+# Buckets tracked at once; the least recently used client is forgotten first
+MAX_CLIENTS = 10_000
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Rate limit exceeded for this client")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`.
+
+    A request costing more than `burst` is let through once the bucket is
+    full and leaves it in debt, so splitting work into requests does not
+    raise a client's long-run average above `rate`. The debt is capped at
+    one `burst`, so no single request can lock a client out for longer than
+    2 * burst / rate.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Spend `cost` tokens; returns 0, or the seconds to wait if there are too few."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        needed = min(cost, self.burst)
+        if self.tokens < needed:
+            return (needed - self.tokens) / self.rate
+        self.tokens = max(self.tokens - cost, -self.burst)
+        return 0.0
+
+    def refund(self, cost: float):
+        """Give back tokens taken for work that never ran."""
+        self.tokens = min(self.burst, self.tokens + cost)
+
+
+class ClientLimiter:
+    """Token bucket per client key with optional per-key (rate, burst) limits.
+
+    A rate of 0 or less means the key is not limited.
+    """
+
+    def __init__(self, rate: float, burst: float, limits: dict = None):
+        self.rate = rate
+        self.burst = burst
+        self.limits = dict(limits or {})
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def limit_for(self, key: str):
+        return self.limits.get(key, (self.rate, self.burst))
+
+    def take(self, key: str, cost: float):
+        """Charge `cost` to `key`'s bucket; raises RateLimited when it is empty."""
+        if self.limit_for(key)[0] <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self.limit_for(key))
+                while len(self._buckets) > MAX_CLIENTS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            wait = bucket.take(cost)
+        if wait > 0:
+            raise RateLimited(max(1, math.ceil(wait)))
+
+    def refund(self, key: str, cost: float):
+        """Return `cost` to `key`'s bucket, e.g. when the request was turned away after take()."""
+        if self.limit_for(key)[0] <= 0:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.refund(cost)
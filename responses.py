@@ -0,0 +1,117 @@
+# responses.py – fast JSON and raw NumPy responses, chosen by the Accept header
+import io
+import json
+
+import numpy as np
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:   # optional; falls back to the standard library encoder
+    orjson = None
+
+JSON = "application/json"
+NPY = "application/x-npy"
+NPZ = "application/x-npz"
+OCTET_STREAM = "application/octet-stream"
+ARRAY_TYPES = (NPY, OCTET_STREAM)
+
+
+def _default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Compact JSON; NumPy arrays and scalars are written without .tolist() under orjson."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed.
+
+    Returning one directly from an endpoint also skips FastAPI's
+    jsonable_encoder pass over the content.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# --- Content negotiation --- #
+def _accept_ranges(header: str):
+    """(media range, q) pairs from an Accept header."""
+    for part in header.split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        if not media:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        yield media.lower(), q
+
+def _quality(offer: str, ranges: list) -> float:
+    # The most specific matching range decides, as in RFC 9110
+    main = offer.split("/")[0]
+    best, specificity = 0.0, -1
+    for media, q in ranges:
+        if media == offer:
+            level = 2
+        elif media == main + "/*":
+            level = 1
+        elif media == "*/*":
+            level = 0
+        else:
+            continue
+        if level > specificity:
+            best, specificity = q, level
+    return best
+
+def preferred_type(request, offers: tuple = (JSON,) + ARRAY_TYPES) -> str:
+    """The offer the request's Accept header ranks highest; ties go to the first offer.
+
+    Requests without an Accept header (or accepting none of the offers) get
+    the first offer, JSON.
+    """
+    header = request.headers.get("accept") if request is not None else None
+    if not header:
+        return offers[0]
+    ranges = list(_accept_ranges(header))
+    scored = [(_quality(offer, ranges), -i, offer) for i, offer in enumerate(offers)]
+    q, _, offer = max(scored)
+    return offer if q > 0 else offers[0]
+
+
+def array_response(array: np.ndarray, media_type: str, headers: dict = None) -> Response:
+    """`array` as a .npy file, or as its raw C-order bytes for application/octet-stream.
+
+    Raw responses describe the buffer in X-Array-Dtype (e.g. "<i8") and
+    X-Array-Shape (comma-separated); .npy files carry both in their header.
+    """
+    array = np.ascontiguousarray(array)
+    headers = dict(headers or {})
+    if media_type == NPY:
+        buffer = io.BytesIO()
+        np.lib.format.write_array(buffer, array, allow_pickle=False)
+        body = buffer.getbuffer()
+    else:
+        body = memoryview(array.reshape(-1).view(np.uint8))
+        headers["X-Array-Dtype"] = array.dtype.str
+        headers["X-Array-Shape"] = ",".join(str(n) for n in array.shape)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+def npz_response(arrays: dict, filename: str, headers: dict = None) -> Response:
+    """Uncompressed .npz download of named arrays (readable with allow_pickle=False)."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', **(headers or {})}
+    return Response(buffer.getbuffer(), media_type=NPZ, headers=headers)
@@ -0,0 +1,74 @@
+# result_cache.py – LRU cache of deterministic (seeded) simulation responses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def request_key(payload: dict) -> str:
+    """Canonical SHA-256 of a request payload (key order does not matter)."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key[:32]}"'
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by entry count and total payload bytes."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (result, size in bytes)
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __contains__(self, key: str) -> bool:
+        # A peek: does not count as a hit or miss or refresh the entry
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: str, result: dict):
+        size = len(json.dumps(result, separators=(",", ":")))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
@@ -0,0 +1,948 @@
+# spin_engine.py – shared Stern–Gerlach simulation core for the APIs, GUIs and scripts
+import random
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+# Atoms simulated per pass; bounds memory at ~CHUNK_SIZE * 32 bytes per state array
+CHUNK_SIZE = 1 << 16
+MAX_CHUNK_SIZE = 1 << 20
+
+# Atoms per independently seeded shard. Shard boundaries (and so the random
+# streams) depend only on the atom count, never on how many workers run them.
+SHARD_SIZE = 1 << 20
+
+# --- Spin basis states --- #
+Z_plus = np.array([1, 0], dtype=complex)
+Z_minus = np.array([0, 1], dtype=complex)
+
+X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
+X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
+
+Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
+Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
+
+
+def theta_plus(theta: float, phi: float = 0):
+    θ = np.radians(theta)
+    φ = np.radians(phi)
+    return np.array([
+        np.cos(θ / 2),
+        np.exp(1j * φ) * np.sin(θ / 2)
+    ], dtype=complex)
+
+def theta_minus(theta: float, phi: float = 0):
+    θ = np.radians(theta)
+    φ = np.radians(phi)
+    return np.array([
+        -np.exp(-1j * φ) * np.sin(θ / 2),
+        np.cos(θ / 2)
+    ], dtype=complex)
+
+
+# --- Axis registry --- #
+# axis name -> (up, down); either fixed states or functions of (θ, φ) in degrees
+AXES = {
+    "x": (X_plus, X_minus),
+    "y": (Y_plus, Y_minus),
+    "z": (Z_plus, Z_minus),
+    "θ": (theta_plus, theta_minus),
+    "θφ": (theta_plus, theta_minus),
+}
+
+
+def axis_names(angled: bool = False, quote: bool = False) -> str:
+    """Registered axes as "x, y, z, θ, or θφ" (only the angled ones if `angled`)."""
+    names = [name for name, (up, _) in AXES.items() if callable(up) or not angled]
+    if quote:
+        names = [f"'{name}'" for name in names]
+    if len(names) < 3:
+        return " or ".join(names)
+    return ", ".join(names[:-1]) + ", or " + names[-1]
+
+
+def register_axis(name: str, up, down):
+    """Add (or replace) an analyzer axis for every simulation entry point.
+
+    `up` / `down` are the analyzer's eigenstates, or functions returning
+    them for (θ, φ) in degrees when the axis is set by angles.
+    """
+    if not callable(up):
+        up = np.array(up, dtype=complex)
+        down = np.array(down, dtype=complex)
+    AXES[name] = (up, down)
+    basis_cache.discard(name)
+    plan_cache.discard(name)
+
+
+# --- Cached analyzer bases --- #
+class AnalyzerBasis(NamedTuple):
+    up: np.ndarray
+    down: np.ndarray
+    up_projector: np.ndarray
+    down_projector: np.ndarray
+
+
+def _frozen(arr: np.ndarray):
+    arr.setflags(write=False)
+    return arr
+
+def make_basis(up: np.ndarray, down: np.ndarray):
+    """Read-only (up, down) eigenstates and their projectors |v><v|."""
+    up = _frozen(np.array(up, dtype=complex))
+    down = _frozen(np.array(down, dtype=complex))
+    return AnalyzerBasis(
+        up, down,
+        _frozen(np.outer(up, up.conj())),
+        _frozen(np.outer(down, down.conj())),
+    )
+
+
+class BasisCache:
+    """Bounded, thread-safe LRU table of analyzer bases keyed by (axis, θ, φ).
+
+    Axes registered with fixed states are permanent entries; angled axes
+    (θ / θφ by default) are built on first use and evicted
+    least-recently-used past `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._permanent = {}
+        self._entries = OrderedDict()
+
+    def get(self, axis: str, theta: float = None, phi: float = 0):
+        basis = self._permanent.get(axis)
+        if basis is not None:
+            with self._lock:
+                self.hits += 1
+            return basis
+
+        states = AXES.get(axis)
+        if states is None:
+            raise ValueError(f"Invalid axis. Choose {axis_names()}.")
+        up, down = states
+        if not callable(up):
+            basis = make_basis(up, down)
+            with self._lock:
+                self._permanent[axis] = basis
+            return basis
+        if theta is None:
+            raise ValueError(f"Theta value must be provided for axis {axis_names(angled=True, quote=True)}.")
+
+        key = (axis, float(theta), float(phi))
+        with self._lock:
+            basis = self._entries.get(key)
+            if basis is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return basis
+            self.misses += 1
+
+        basis = make_basis(up(theta, phi), down(theta, phi))
+        with self._lock:
+            self._entries[key] = basis
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return basis
+
+    def discard(self, axis: str):
+        """Drop every entry built for `axis` (after it is re-registered)."""
+        with self._lock:
+            self._permanent.pop(axis, None)
+            for key in [key for key in self._entries if key[0] == axis]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+basis_cache = BasisCache()
+
+
+def analyzer_basis(axis: str, theta: float = None, phi: float = 0):
+    """Return the (up, down) eigenstates measured by an analyzer."""
+    basis = basis_cache.get(axis, theta, phi)
+    return basis.up, basis.down
+
+
+# --- Single atoms --- #
+def random_state(rng: np.random.Generator = None):
+    """One random normalized spin state."""
+    if rng is None:
+        vec = np.random.randn(2) + 1j * np.random.randn(2)
+    else:
+        vec = rng.standard_normal(2) + 1j * rng.standard_normal(2)
+    vec /= np.linalg.norm(vec)
+    return vec
+
+def measure(state: np.ndarray, axis: str, theta: float = None, phi: float = 0,
+            rng: np.random.Generator = None):
+    """Measure one atom along `axis`; returns (collapsed state, "up" / "down")."""
+    up, down = analyzer_basis(axis, theta, phi)
+    prob_up = abs(np.vdot(up, state))**2
+    draw = random.random() if rng is None else rng.random()
+    outcome = "up" if draw < prob_up else "down"
+    return (up if outcome == "up" else down, outcome)
+
+
+# --- Analyzer chains --- #
+class Analyzer(NamedTuple):
+    """Plain analyzer setting for scripts; the APIs pass their pydantic models."""
+    axis: str
+    filter: str = "both"   # up, down, both (or all)
+    theta: float = None
+    phi: float = 0
+
+
+# Filters that let every outcome through; "all" reads better than "both" above spin 1/2
+PASS_ALL = ("both", "all")
+
+def filter_level(filt: str, labels=("up", "down")):
+    """Index in `labels` of the one level `filt` passes: None if it passes
+    every level, -1 if it passes none (an unknown filter blocks the beam).
+    """
+    if filt in PASS_ALL:
+        return None
+    if filt in labels:
+        return labels.index(filt)
+    return -1
+
+
+def chain_settings(analyzers: list):
+    """Resolve analyzers into their (up, down) bases and filter settings."""
+    bases = [analyzer_basis(an.axis, getattr(an, "theta", None), getattr(an, "phi", 0))
+             for an in analyzers]
+    filters = [an.filter for an in analyzers]
+    return bases, filters
+
+
+# --- Batched states --- #
+def random_states(n: int, rng: np.random.Generator):
+    """n random normalized spin states as an (n, 2) array."""
+    vecs = rng.standard_normal((n, 2)) + 1j * rng.standard_normal((n, 2))
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+def fixed_states(state: np.ndarray, n: int):
+    """n copies of one normalized state as an (n, 2) array."""
+    return np.broadcast_to(state, (n, 2))
+
+
+def measure_batch(states: np.ndarray, up: np.ndarray, down: np.ndarray,
+                  rng: np.random.Generator):
+    """Measure every row of `states` against (up, down).
+
+    Returns the collapsed states and a boolean array that is True where
+    the outcome was "up".
+    """
+    prob_up = np.abs(states @ up.conj())**2
+    is_up = rng.random(len(states)) < prob_up
+    collapsed = np.where(is_up[:, None], up, down)
+    return collapsed, is_up
+
+
+def forget_flags(forget, n_analyzers: int):
+    """Per analyzer, whether the beam is re-randomized after it.
+
+    `forget` is either one bool for every gap between analyzers or a list
+    with one flag per gap (e.g. [False, True] forgets only before the third).
+    """
+    if isinstance(forget, bool):
+        return [forget and i < n_analyzers - 1 for i in range(n_analyzers)]
+    flags = [bool(f) for f in forget][:n_analyzers - 1]
+    return flags + [False] * (n_analyzers - len(flags))
+
+
+# --- Chain plans --- #
+class ChainPlan(NamedTuple):
+    """An analyzer chain compiled for the batched kernels; nothing in it is a string
+    the kernels have to dispatch on.
+    """
+    bases: tuple      # read-only (up, down) eigenstates per analyzer
+    filters: tuple    # the filter names, for reporting and post-processing
+    keep: np.ndarray  # (analyzers, 2) read-only bools: do "up" / "down" atoms go on?
+    resets: tuple     # per analyzer, whether the beam is re-randomized after it
+    stop: int         # analyzers the kernels run; the last one may block every atom
+
+
+def compile_plan(analyzers: list, forget=False) -> ChainPlan:
+    """Resolve bases, filter masks and forget flags once for a chain."""
+    bases, filters = chain_settings(analyzers)
+    levels = [filter_level(f) for f in filters]
+    keep = np.array([[level in (None, 0), level in (None, 1)] for level in levels],
+                    dtype=bool).reshape(len(filters), 2)
+    # Nothing gets past an analyzer with an unknown filter
+    blocking = np.flatnonzero(~keep.any(axis=1))
+    stop = int(blocking[0]) + 1 if len(blocking) else len(bases)
+    return ChainPlan(tuple(bases), tuple(filters), _frozen(keep),
+                     tuple(forget_flags(forget, len(bases))), stop)
+
+
+def plan_key(analyzers: list, forget=False) -> tuple:
+    """Normalized cache key: angles only count for angled axes, forget as per-gap flags."""
+    key = []
+    for an in analyzers:
+        up, _ = AXES.get(an.axis, (None, None))
+        if callable(up):
+            theta = getattr(an, "theta", None)
+            key.append((an.axis, an.filter, None if theta is None else float(theta),
+                        float(getattr(an, "phi", 0))))
+        else:
+            key.append((an.axis, an.filter))
+    return tuple(key), tuple(forget_flags(forget, len(analyzers)))
+
+
+class PlanCache:
+    """Bounded, thread-safe LRU of compiled chain plans keyed by plan_key.
+
+    Repeated chain configurations (the frontend sends the same few over and
+    over) skip basis lookups and filter parsing entirely.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, analyzers: list, forget=False) -> ChainPlan:
+        key = plan_key(analyzers, forget)
+        with self._lock:
+            plan = self._entries.get(key)
+            if plan is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = compile_plan(analyzers, forget)
+        with self._lock:
+            self._entries[key] = plan
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return plan
+
+    def discard(self, axis: str):
+        """Drop every plan that uses `axis` (after it is re-registered)."""
+        with self._lock:
+            for key in [key for key in self._entries
+                        if any(entry[0] == axis for entry in key[0])]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+plan_cache = PlanCache()
+
+
+def chain_plan(analyzers: list, forget=False) -> ChainPlan:
+    """The cached plan for `analyzers`; raises ValueError for an invalid axis."""
+    return plan_cache.get(analyzers, forget)
+
+
+def run_chain_batch(states: np.ndarray, plan: ChainPlan, counts: np.ndarray,
+                    rng: np.random.Generator):
+    """Send one batch of atoms through a compiled chain.
+
+    Per-analyzer [up, down] tallies are added into the (analyzers, 2)
+    `counts` array in place, exactly as the per-atom loop in stage1V2 did:
+    atoms blocked by a filter are not counted at that analyzer and never
+    reach the next one.
+    """
+    for i in range(plan.stop):
+        if len(states) == 0:
+            break
+
+        up, down = plan.bases[i]
+        states, is_up = measure_batch(states, up, down, rng)
+
+        # Apply filtering
+        keep_up, keep_down = plan.keep[i]
+        if keep_up and keep_down:
+            n_up = int(np.count_nonzero(is_up))
+            counts[i, 0] += n_up
+            counts[i, 1] += len(is_up) - n_up
+        elif keep_up or keep_down:
+            states = states[is_up if keep_up else ~is_up]
+            counts[i, 0 if keep_up else 1] += len(states)
+        else:
+            # No outcome matches an unknown filter, so every atom is blocked
+            break
+
+        # Optional randomization between analyzers
+        if plan.resets[i]:
+            states = random_states(len(states), rng)
+
+    return counts
+
+
+def iter_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+               forget=False, chunk_size: int = CHUNK_SIZE,
+               rng: np.random.Generator = None):
+    """Simulate `atoms` atoms through `analyzers` in chunks of `chunk_size`.
+
+    `analyzers` are objects with axis / filter / theta / phi attributes
+    (e.g. Analyzer or stage1V2.AnalyzerInput). If `state` is given every
+    atom starts in it, otherwise each atom starts in a random state. Pass a
+    seeded `rng` for reproducible counts.
+
+    Yields (atoms done, running counts) after every chunk; the counts list
+    is updated in place, so copy it if it must outlive the next chunk.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    tallies = np.zeros((len(analyzers), 2), dtype=np.int64)
+    counts = [{"up": 0, "down": 0} for _ in analyzers]
+
+    done = 0
+    while done < atoms:
+        n = min(chunk_size, atoms - done)
+        if state is None:
+            states = random_states(n, rng)
+        else:
+            states = fixed_states(state, n)
+        run_chain_batch(states, plan, tallies, rng)
+        for tally, (up, down) in zip(counts, tallies.tolist()):
+            tally["up"], tally["down"] = up, down
+        done += n
+        yield done, counts
+
+
+def simulate_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                   forget=False, chunk_size: int = CHUNK_SIZE,
+                   rng: np.random.Generator = None):
+    """Run iter_chain to completion and return the final per-analyzer counts."""
+    counts = [{"up": 0, "down": 0} for _ in analyzers]
+    for _, counts in iter_chain(analyzers, atoms, state, forget, chunk_size, rng):
+        pass
+    return counts
+
+
+# --- Several requests, one chain --- #
+def run_group_batch(states: np.ndarray, owner: np.ndarray, plan: ChainPlan,
+                    counts: np.ndarray, rng: np.random.Generator):
+    """run_chain_batch for atoms belonging to several requests.
+
+    `owner[k]` is the request index of atom k and `counts` an
+    (analyzers, 2, requests) array of up/down tallies, updated in place.
+    """
+    n_owners = counts.shape[2]
+    for i in range(plan.stop):
+        if len(states) == 0:
+            break
+
+        up, down = plan.bases[i]
+        states, is_up = measure_batch(states, up, down, rng)
+
+        # Apply filtering
+        keep_up, keep_down = plan.keep[i]
+        if keep_up and keep_down:
+            counts[i, 0] += np.bincount(owner[is_up], minlength=n_owners)
+            counts[i, 1] += np.bincount(owner[~is_up], minlength=n_owners)
+        elif keep_up or keep_down:
+            passed = is_up if keep_up else ~is_up
+            states, owner = states[passed], owner[passed]
+            counts[i, 0 if keep_up else 1] += np.bincount(owner, minlength=n_owners)
+        else:
+            break
+
+        # Optional randomization between analyzers
+        if plan.resets[i]:
+            states = random_states(len(states), rng)
+
+    return counts
+
+
+def simulate_group(analyzers: list, atoms: list, states: list, forget: bool = False,
+                   chunk_size: int = CHUNK_SIZE, rng: np.random.Generator = None):
+    """Simulate several requests that share one analyzer chain in one pass.
+
+    Request r sends `atoms[r]` atoms starting in `states[r]` (None for random
+    states). Their atoms are laid end to end and chunked together, and each
+    chunk is measured once with per-atom owner indices. Returns one counts
+    list per request.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    offsets = np.cumsum(atoms, dtype=np.int64)
+    total = int(offsets[-1]) if len(atoms) else 0
+    is_fixed = np.array([state is not None for state in states], dtype=bool)
+    fixed = np.array([state if state is not None else Z_plus for state in states],
+                     dtype=complex).reshape(-1, 2)
+    counts = np.zeros((len(analyzers), 2, len(atoms)), dtype=np.int64)
+
+    for lo in range(0, total, chunk_size):
+        hi = min(lo + chunk_size, total)
+        owner = np.searchsorted(offsets, np.arange(lo, hi), side="right")
+        chunk = random_states(hi - lo, rng)
+        fixed_rows = is_fixed[owner]
+        if fixed_rows.any():
+            chunk[fixed_rows] = fixed[owner[fixed_rows]]
+        run_group_batch(chunk, owner, plan, counts, rng)
+
+    return [
+        [{"up": int(counts[i, 0, r]), "down": int(counts[i, 1, r])} for i in range(len(analyzers))]
+        for r in range(len(atoms))
+    ]
+
+
+# --- Sharded streams --- #
+def shard_sizes(atoms: int, shard_size: int = SHARD_SIZE):
+    return [min(shard_size, atoms - start) for start in range(0, atoms, shard_size)]
+
+def shard_rng(entropy: int, index: int):
+    """Independent child stream `index` of SeedSequence(entropy)."""
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+
+def add_counts(total: list, counts: list):
+    for t, c in zip(total, counts):
+        for outcome, n in c.items():
+            t[outcome] = t.get(outcome, 0) + n
+    return total
+
+
+def iter_sharded_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                       forget: bool = False, chunk_size: int = CHUNK_SIZE,
+                       entropy: int = None, chain=None):
+    """iter_chain over SHARD_SIZE shards, each with its own child stream.
+
+    Running the shards one after another here or spread over worker
+    processes (see simulate_chain with shard_rng) gives identical counts
+    for the same `entropy`. `chain` swaps in another iter_chain-compatible
+    kernel, e.g. spin_j.iter_spin_chain.
+    """
+    if entropy is None:
+        entropy = np.random.SeedSequence().entropy
+    if chain is None:
+        chain = iter_chain
+    total = [{} for _ in analyzers]
+
+    done = 0
+    for index, n in enumerate(shard_sizes(atoms)):
+        for shard_done, counts in chain(analyzers, n, state, forget, chunk_size,
+                                        shard_rng(entropy, index)):
+            running = add_counts([dict(t) for t in total], counts)
+            yield done + shard_done, running
+        total = running
+        done += n
+
+
+# --- Per-atom outcomes --- #
+def run_chain_outcomes(states: np.ndarray, plan: ChainPlan, rng: np.random.Generator):
+    """run_chain_batch that keeps every atom's outcome instead of tallies.
+
+    Returns an (analyzers, atoms) bool array, True where the atom measured
+    "up". Atoms are False at every analyzer after the one that blocked
+    them, so where an atom stopped follows from the bits and the filters
+    (see blocked_stage). Draws exactly the random numbers run_chain_batch
+    does, so the same rng gives the same atoms.
+    """
+    outcomes = np.zeros((len(plan.bases), len(states)), dtype=bool)
+    alive = np.arange(len(states))
+    for i in range(plan.stop):
+        if len(states) == 0:
+            break
+
+        up, down = plan.bases[i]
+        states, is_up = measure_batch(states, up, down, rng)
+        outcomes[i, alive] = is_up
+
+        keep_up, keep_down = plan.keep[i]
+        if keep_up != keep_down:
+            passed = is_up if keep_up else ~is_up
+            states, alive = states[passed], alive[passed]
+        elif not keep_up:
+            break
+
+        if plan.resets[i]:
+            states = random_states(len(states), rng)
+
+    return outcomes
+
+
+def blocked_stage(outcomes: np.ndarray, filters: list) -> np.ndarray:
+    """Per atom, the index of the analyzer that blocked it (len(filters) if none did)."""
+    stage = np.full(outcomes.shape[1], len(filters), dtype=np.int64)
+    # Walk backwards so the first blocking analyzer is the one that sticks
+    for i in reversed(range(len(filters))):
+        level = filter_level(filters[i])
+        if level is None:
+            continue
+        if level == 0:
+            stage[~outcomes[i]] = i
+        elif level == 1:
+            stage[outcomes[i]] = i
+        else:
+            stage[:] = i
+    return stage
+
+
+def outcome_counts(outcomes: np.ndarray, filters: list, stage: np.ndarray = None) -> np.ndarray:
+    """(analyzers, 2) [up, down] tallies of per-atom outcomes, as run_chain_batch counts them."""
+    if stage is None:
+        stage = blocked_stage(outcomes, filters)
+    counts = np.zeros((len(filters), 2), dtype=np.int64)
+    for i, filt in enumerate(filters):
+        level = filter_level(filt)
+        if level is None:
+            reached = stage >= i
+            n_up = np.count_nonzero(outcomes[i] & reached)
+            counts[i] = n_up, np.count_nonzero(reached) - n_up
+        elif level != -1:
+            counts[i, level] = np.count_nonzero(stage > i)
+    return counts
+
+
+def pack_outcomes(outcomes: np.ndarray) -> np.ndarray:
+    """(ceil(atoms / 8), analyzers) uint8; bit j of row b is atom 8b + j (little-endian)."""
+    return np.ascontiguousarray(np.packbits(outcomes, axis=1, bitorder="little").T)
+
+def unpack_outcomes(packed: np.ndarray, atoms: int) -> np.ndarray:
+    """Inverse of pack_outcomes: the (analyzers, atoms) bool array."""
+    return np.unpackbits(packed, axis=0, count=atoms, bitorder="little").T.astype(bool)
+
+
+def iter_outcomes(analyzers: list, atoms: int, state: np.ndarray = None, forget=False,
+                  chunk_size: int = CHUNK_SIZE, rng: np.random.Generator = None):
+    """iter_chain's atoms, yielding each chunk's (analyzers, n) outcome array instead of counts."""
+    if rng is None:
+        rng = np.random.default_rng()
+    plan = chain_plan(analyzers, forget)
+    done = 0
+    while done < atoms:
+        n = min(chunk_size, atoms - done)
+        if state is None:
+            states = random_states(n, rng)
+        else:
+            states = fixed_states(state, n)
+        yield run_chain_outcomes(states, plan, rng)
+        done += n
+
+def iter_sharded_outcomes(analyzers: list, atoms: int, state: np.ndarray = None,
+                          forget=False, chunk_size: int = CHUNK_SIZE, entropy: int = None,
+                          kernel=None):
+    """iter_outcomes over the shards of iter_sharded_chain (same atoms for the same entropy).
+
+    `kernel` swaps in another iter_outcomes-compatible kernel, e.g.
+    bloch.iter_bloch_outcomes.
+    """
+    if entropy is None:
+        entropy = np.random.SeedSequence().entropy
+    if kernel is None:
+        kernel = iter_outcomes
+    for index, n in enumerate(shard_sizes(atoms)):
+        yield from kernel(analyzers, n, state, forget, chunk_size, shard_rng(entropy, index))
+
+
+def iter_chain_outcomes(analyzers: list, atoms: int, state: np.ndarray = None,
+                        forget=False, chunk_size: int = CHUNK_SIZE, entropy: int = None,
+                        kernel=None):
+    """Per-atom outcomes of the run iter_sharded_chain would make, as packed blocks.
+
+    Yields (packed, counts): `packed` holds the next whole bytes of the
+    pack_outcomes layout, `counts` the [up, down] tallies of the atoms
+    simulated since the previous block. Concatenating the blocks gives the
+    packed outcomes of the whole run, and with the same `entropy` and
+    `chunk_size` the summed counts equal iter_sharded_chain's when `kernel`
+    is the outcome twin of its `chain` (iter_outcomes for iter_chain).
+    """
+    filters = [an.filter for an in analyzers]
+    carry = np.zeros((len(analyzers), 0), dtype=bool)
+    for outcomes in iter_sharded_outcomes(analyzers, atoms, state, forget, chunk_size, entropy,
+                                          kernel):
+        counts = outcome_counts(outcomes, filters)
+        # Chunks that are not a multiple of 8 atoms leave bits for the next byte
+        outcomes = np.concatenate([carry, outcomes], axis=1)
+        whole = outcomes.shape[1] // 8 * 8
+        carry = outcomes[:, whole:]
+        yield pack_outcomes(outcomes[:, :whole]), counts
+
+    if carry.shape[1]:
+        yield pack_outcomes(carry), np.zeros((len(analyzers), 2), dtype=np.int64)
+
+
+# --- Joint outcome histograms --- #
+# An atom blocked at analyzer s falls in one of 2^s bins (its outcomes before
+# s); an atom that passes all k analyzers in one of 2^k. Bin codes are
+# 2^s - 1 + (outcome bits before s), so there are 2^(k+1) - 1 bins in all.
+def joint_bins(n_analyzers: int) -> int:
+    return (1 << (n_analyzers + 1)) - 1
+
+@lru_cache(maxsize=16)
+def joint_labels(n_analyzers: int) -> tuple:
+    """Bin names: "u" / "d" per analyzer reached, then "-" if the atom was blocked.
+
+    E.g. for three analyzers "udu" passed all three, "d-" was down at the
+    first and blocked at the second, "-" was blocked at the first.
+    """
+    labels = []
+    for stage in range(n_analyzers + 1):
+        for prefix in range(1 << stage):
+            outcomes = "".join("u" if prefix >> i & 1 else "d" for i in range(stage))
+            labels.append(outcomes if stage == n_analyzers else outcomes + "-")
+    return tuple(labels)
+
+def joint_histogram(outcomes: np.ndarray, filters: list, stage: np.ndarray = None) -> np.ndarray:
+    """Atoms per joint_labels bin, from one bincount over per-atom codes."""
+    if stage is None:
+        stage = blocked_stage(outcomes, filters)
+    k = len(filters)
+    before_block = np.arange(k)[:, None] < stage
+    weights = np.left_shift(1, np.arange(k, dtype=np.int64))
+    prefix = weights @ (outcomes & before_block)
+    return np.bincount((1 << stage) - 1 + prefix, minlength=joint_bins(k))
+
+def iter_joint_chain(analyzers: list, atoms: int, state: np.ndarray = None, forget=False,
+                     chunk_size: int = CHUNK_SIZE, rng: np.random.Generator = None,
+                     kernel=None):
+    """iter_chain plus the joint histogram; yields (atoms done, counts, histogram).
+
+    With the default `kernel` (iter_outcomes) it draws the same random
+    numbers as iter_chain, so the counts are the same; with
+    bloch.iter_bloch_outcomes it matches bloch.iter_bloch_chain instead.
+    Both running totals are updated in place.
+    """
+    if kernel is None:
+        kernel = iter_outcomes
+    filters = [an.filter for an in analyzers]
+    counts = [{"up": 0, "down": 0} for _ in analyzers]
+    histogram = np.zeros(joint_bins(len(analyzers)), dtype=np.int64)
+    done = 0
+    for outcomes in kernel(analyzers, atoms, state, forget, chunk_size, rng):
+        stage = blocked_stage(outcomes, filters)
+        for tally, (up, down) in zip(counts, outcome_counts(outcomes, filters, stage)):
+            tally["up"] += int(up)
+            tally["down"] += int(down)
+        histogram += joint_histogram(outcomes, filters, stage)
+        done += outcomes.shape[1]
+        yield done, counts, histogram
+
+
+# --- Counter-based runs --- #
+# Every atom owns a fixed block of uniforms from a Philox stream keyed by the
+# run seed, so any slice of atoms can be regenerated on its own: atom i's
+# block starts at Philox counter i * width / 4, whatever was simulated before.
+def run_key(seed: int) -> np.ndarray:
+    """128-bit Philox key for a run seed."""
+    return np.random.SeedSequence(seed).generate_state(2, dtype=np.uint64)
+
+def atom_width(n_analyzers: int) -> int:
+    # Initial state (2 uniforms), then per analyzer the measurement (1) and a
+    # possible fresh state after it (2); padded to whole 4-word Philox blocks
+    return -(-(2 + 3 * n_analyzers) // 4) * 4
+
+def atom_uniforms(key: np.ndarray, offset: int, n: int, width: int) -> np.ndarray:
+    """(n, width) uniforms of atoms offset ... offset + n - 1, in O(n) time."""
+    bit_generator = np.random.Philox(key=key, counter=offset * width // 4)
+    return np.random.Generator(bit_generator).random((n, width))
+
+
+def bloch_states(u_theta: np.ndarray, u_phi: np.ndarray):
+    """Random states, uniform on the Bloch sphere, from two uniforms each."""
+    half = np.arccos(1 - 2 * u_theta) / 2
+    return np.stack([np.cos(half) + 0j, np.exp(2j * np.pi * u_phi) * np.sin(half)], axis=1)
+
+
+def run_atoms(plan: ChainPlan, uniforms: np.ndarray, state: np.ndarray = None):
+    """Send the atoms owning `uniforms` through the chain.
+
+    Returns (initial states, outcomes) with outcomes laid out as in
+    run_chain_outcomes. Each atom only uses its own row of `uniforms`, so
+    the result for an atom does not depend on the slice it is computed in.
+    """
+    n = len(uniforms)
+    if state is None:
+        states = bloch_states(uniforms[:, 0], uniforms[:, 1])
+    else:
+        states = fixed_states(state, n)
+    initial = states
+    outcomes = np.zeros((len(plan.bases), n), dtype=bool)
+    alive = np.ones(n, dtype=bool)
+    for i in range(plan.stop):
+        up, down = plan.bases[i]
+        column = 2 + 3 * i
+        is_up = uniforms[:, column] < np.abs(states @ up.conj())**2
+        states = np.where(is_up[:, None], up, down)
+        outcomes[i] = is_up & alive
+
+        keep_up, keep_down = plan.keep[i]
+        if keep_up != keep_down:
+            alive &= is_up if keep_up else ~is_up
+        elif not keep_up:
+            break
+
+        if plan.resets[i]:
+            states = bloch_states(uniforms[:, column + 1], uniforms[:, column + 2])
+
+    return initial, outcomes
+
+
+def simulate_run(analyzers: list, atoms: int, seed: int, state: np.ndarray = None,
+                 forget=False, start: int = 0, chunk_size: int = CHUNK_SIZE):
+    """[up, down] counts per analyzer of atoms start ... start + atoms - 1 of a run."""
+    plan = chain_plan(analyzers, forget)
+    key = run_key(seed)
+    width = atom_width(len(plan.bases))
+    counts = np.zeros((len(plan.bases), 2), dtype=np.int64)
+    for offset in range(start, start + atoms, chunk_size):
+        n = min(chunk_size, start + atoms - offset)
+        _, outcomes = run_atoms(plan, atom_uniforms(key, offset, n, width), state)
+        counts += outcome_counts(outcomes, plan.filters)
+    return counts
+
+
+# --- Closed-form sampling --- #
+def transition_probability(state: np.ndarray, target: np.ndarray):
+    """Probability |<target|state>|^2 along the last axis, clipped to [0, 1]."""
+    return np.clip(np.abs(np.sum(target.conj() * state, axis=-1))**2, 0.0, 1.0)
+
+
+def propagate_chain(bases: list, filters: list, atoms: int, state: np.ndarray = None,
+                    forget: bool = False, rng: np.random.Generator = None):
+    """Markov-chain propagation of a beam through the analyzer chain.
+
+    After each analyzer every atom has collapsed onto that analyzer's up or
+    down state, so the beam is at most two populations. Each population is
+    split with one binomial draw per analyzer, so the cost depends on the
+    number of analyzers, not on `atoms`. A random input state (or a `forget`
+    re-randomization) gives "up" with probability 1/2 for any analyzer.
+
+    Each (up, down) pair in `bases` is either a single (2,) basis or a (G, 2)
+    stack, which propagates G independent configurations at once. Returns
+    sampled counts and exact probabilities, both shaped (analyzers, 2, G)
+    with index 0 for up and 1 for down.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    G = max([np.shape(up)[0] for up, _ in bases if np.ndim(up) == 2], default=1)
+    counts = np.zeros((len(bases), 2, G), dtype=np.int64)
+    probs = np.zeros((len(bases), 2, G))
+
+    # (state, atom counts, probability mass); a state of None means randomized
+    populations = [(state, np.full(G, atoms, dtype=np.int64), np.ones(G))]
+    last = len(bases) - 1
+    for i, ((up, down), filt) in enumerate(zip(bases, filters)):
+        n_up = np.zeros(G, dtype=np.int64)
+        m_up = np.zeros(G)
+        n_total = np.zeros(G, dtype=np.int64)
+        m_total = np.zeros(G)
+        for psi, n, m in populations:
+            p_up = np.full(G, 0.5) if psi is None else np.broadcast_to(transition_probability(psi, up), G)
+            n_up += rng.binomial(n, p_up)
+            m_up += m * p_up
+            n_total += n
+            m_total += m
+        n_down = n_total - n_up
+        m_down = m_total - m_up
+
+        # Apply filtering
+        level = filter_level(filt)
+        if level is None:
+            populations = [(up, n_up, m_up), (down, n_down, m_down)]
+        elif level == 0:
+            populations = [(up, n_up, m_up)]
+            n_down, m_down = 0, 0.0
+        elif level == 1:
+            populations = [(down, n_down, m_down)]
+            n_up, m_up = 0, 0.0
+        else:
+            # No outcome matches an unknown filter, so every atom is blocked
+            break
+
+        counts[i, 0], counts[i, 1] = n_up, n_down
+        probs[i, 0], probs[i, 1] = m_up, m_down
+
+        # Optional randomization between analyzers
+        if forget and i < last:
+            n_left = sum(n for _, n, _ in populations)
+            m_left = sum(m for _, _, m in populations)
+            populations = [(None, n_left, m_left)]
+
+    return counts, probs
+
+
+def sample_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                 forget: bool = False, rng: np.random.Generator = None):
+    """Draw per-analyzer counts without simulating individual atoms."""
+    plan = chain_plan(analyzers, forget)
+    counts, _ = propagate_chain(list(plan.bases), list(plan.filters), atoms, state, forget, rng)
+    return [{"up": int(up), "down": int(down)} for up, down in counts[:, :, 0]]
+
+
+# --- θ/φ sweeps --- #
+# Grid points propagated per block; keeps sweep memory flat for large grids
+SWEEP_BLOCK = 1 << 14
+
+def sweep_bases(thetas: np.ndarray, phis: np.ndarray):
+    """(G, 2) stacks of θφ up / down states for paired θ, φ arrays in degrees."""
+    θ = np.radians(thetas)
+    φ = np.radians(phis)
+    c, s = np.cos(θ / 2), np.sin(θ / 2)
+    up = np.stack([c, np.exp(1j * φ) * s], axis=-1)
+    down = np.stack([-np.exp(-1j * φ) * s, c.astype(complex)], axis=-1)
+    return up, down
+
+
+def sweep_chain(analyzers: list, index: int, thetas: np.ndarray, phis: np.ndarray,
+                atoms: int, state: np.ndarray = None, forget: bool = False,
+                rng: np.random.Generator = None):
+    """Sweep analyzer `index` over the θ × φ grid (degrees).
+
+    The swept analyzer keeps its filter but measures along θφ for every grid
+    point; the others are used as given. Returns sampled counts and exact
+    probabilities shaped (analyzers, 2, len(thetas), len(phis)).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    T, P = np.meshgrid(np.asarray(thetas, dtype=float), np.asarray(phis, dtype=float),
+                       indexing="ij")
+    T, P = T.ravel(), P.ravel()
+    fixed = [None if i == index else analyzer_basis(an.axis, an.theta, an.phi)
+             for i, an in enumerate(analyzers)]
+    filters = [an.filter for an in analyzers]
+
+    counts = np.zeros((len(analyzers), 2, len(T)), dtype=np.int64)
+    probs = np.zeros((len(analyzers), 2, len(T)))
+    for lo in range(0, len(T), SWEEP_BLOCK):
+        hi = min(lo + SWEEP_BLOCK, len(T))
+        swept = sweep_bases(T[lo:hi], P[lo:hi])
+        bases = [swept if basis is None else basis for basis in fixed]
+        counts[:, :, lo:hi], probs[:, :, lo:hi] = propagate_chain(
+            bases, filters, atoms, state, forget, rng)
+
+    shape = (len(analyzers), 2, len(thetas), len(phis))
+    return counts.reshape(shape), probs.reshape(shape)
@@ -0,0 +1,224 @@
+# spin_j.py – Stern–Gerlach simulation for arbitrary spin j
+import math
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+from bloch import bloch_vector
+from spin_engine import CHUNK_SIZE, basis_cache, filter_level
+
+
+def dimension(spin: float) -> int:
+    """Number of levels 2j + 1; raises ValueError unless j is a positive half-integer."""
+    twice = 2 * spin
+    # round() raises OverflowError on inf, which 2 * 1e308 already is
+    if not math.isfinite(twice) or spin <= 0 or twice != round(twice):
+        raise ValueError("Spin must be a positive multiple of 1/2")
+    return int(round(twice)) + 1
+
+
+def level_labels(spin: float) -> list:
+    """Outcome names from m = +j down to m = -j."""
+    d = dimension(spin)
+    if d == 2:
+        return ["up", "down"]
+    if d == 3:
+        return ["up", "zero", "down"]
+    j = Fraction(d - 1, 2)
+    return [str(j - k) for k in range(d)]
+
+
+def empty_counts(n_analyzers: int, spin: float) -> list:
+    labels = level_labels(spin)
+    return [dict.fromkeys(labels, 0) for _ in range(n_analyzers)]
+
+
+# --- Rotation matrices --- #
+@lru_cache(maxsize=32)
+def _jy_eigensystem(d: int):
+    # J+ in the |m = j ... -j> basis; Jy = (J+ - J-) / 2i
+    j = (d - 1) / 2
+    m = j - np.arange(d)
+    j_plus = np.diag(np.sqrt(j * (j + 1) - m[1:] * (m[1:] + 1)), k=1)
+    jy = (j_plus - j_plus.T) / 2j
+    return np.linalg.eigh(jy)
+
+
+@lru_cache(maxsize=4096)
+def rotation_matrix(d: int, theta: float, phi: float) -> np.ndarray:
+    """D(φ, θ) = exp(-iφJz) exp(-iθJy) for 2j + 1 = d, angles in degrees.
+
+    Column k is the eigenstate of n·J with m = j - k, n pointing along (θ, φ).
+    The result is cached and read-only.
+    """
+    θ = np.radians(theta)
+    φ = np.radians(phi)
+    vals, vecs = _jy_eigensystem(d)
+    d_small = (vecs * np.exp(-1j * θ * vals)) @ vecs.conj().T
+    m = (d - 1) / 2 - np.arange(d)
+    rotation = np.exp(-1j * φ * m)[:, None] * d_small
+    rotation.setflags(write=False)
+    return rotation
+
+
+def axis_angles(axis: str, theta: float = None, phi: float = 0) -> tuple:
+    """(θ, φ) in degrees of the direction an analyzer measures along.
+
+    Read off the Bloch vector of the axis' spin-1/2 "up" state, so every
+    axis in spin_engine.AXES (including register_axis ones) works at any spin.
+    """
+    x, y, z = bloch_vector(basis_cache.get(axis, theta, phi).up)
+    return float(np.degrees(np.arccos(np.clip(z, -1.0, 1.0)))), float(np.degrees(np.arctan2(y, x)))
+
+
+def spin_basis(spin: float, axis: str, theta: float = None, phi: float = 0):
+    """Eigenbasis (as matrix columns, m = j ... -j) measured by an analyzer."""
+    return rotation_matrix(dimension(spin), *axis_angles(axis, theta, phi))
+
+
+def chain_settings(analyzers: list, spin: float):
+    """Bases plus the level each analyzer lets through.
+
+    A filter of "both" / "all" passes every level (None), a level label
+    passes only that level, and anything else blocks the beam (-1).
+    """
+    labels = level_labels(spin)
+    bases, filters = [], []
+    for an in analyzers:
+        theta, phi = getattr(an, "theta", None), getattr(an, "phi", 0)
+        bases.append(spin_basis(spin, an.axis, theta, phi))
+        filters.append(filter_level(an.filter, labels))
+    return bases, filters
+
+
+def format_counts(counts: np.ndarray, spin: float) -> list:
+    labels = level_labels(spin)
+    return [dict(zip(labels, map(int, row))) for row in counts]
+
+
+# --- Batched kernel --- #
+def random_spin_states(n: int, d: int, rng: np.random.Generator):
+    vecs = rng.standard_normal((n, d)) + 1j * rng.standard_normal((n, d))
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)
+    return vecs
+
+
+def measure_levels(states: np.ndarray, basis: np.ndarray, rng: np.random.Generator):
+    """Draw one outcome level per row of `states`; returns (collapsed, levels)."""
+    probs = np.abs(states @ basis.conj())**2
+    cumulative = np.cumsum(probs, axis=1)
+    draws = rng.random((len(states), 1)) * cumulative[:, -1:]
+    levels = np.minimum(np.count_nonzero(draws >= cumulative, axis=1), basis.shape[0] - 1)
+    return basis.T[levels], levels
+
+
+def run_spin_chain_batch(states: np.ndarray, bases: list, filters: list, forget: bool,
+                         counts: np.ndarray, rng: np.random.Generator):
+    """Spin-j run_chain_batch; `counts` is an (analyzers, 2j + 1) array."""
+    d = counts.shape[1]
+    last = len(bases) - 1
+    for i, (basis, level) in enumerate(zip(bases, filters)):
+        if len(states) == 0 or level == -1:
+            break
+
+        states, levels = measure_levels(states, basis, rng)
+
+        # Apply filtering
+        if level is not None:
+            passed = levels == level
+            states = states[passed]
+            counts[i, level] += len(states)
+        else:
+            counts[i] += np.bincount(levels, minlength=d)
+
+        # Optional randomization between analyzers
+        if forget and i < last:
+            states = random_spin_states(len(states), d, rng)
+
+    return counts
+
+
+def iter_spin_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                    forget: bool = False, chunk_size: int = CHUNK_SIZE,
+                    rng: np.random.Generator = None, spin: float = 1):
+    """Spin-j counterpart of spin_engine.iter_chain (counts keyed by level label)."""
+    if rng is None:
+        rng = np.random.default_rng()
+    d = dimension(spin)
+    bases, filters = chain_settings(analyzers, spin)
+    counts = np.zeros((len(analyzers), d), dtype=np.int64)
+
+    done = 0
+    while done < atoms:
+        n = min(chunk_size, atoms - done)
+        if state is None:
+            states = random_spin_states(n, d, rng)
+        else:
+            states = np.broadcast_to(state, (n, d))
+        run_spin_chain_batch(states, bases, filters, forget, counts, rng)
+        done += n
+        yield done, format_counts(counts, spin)
+
+
+def simulate_spin_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                        forget: bool = False, chunk_size: int = CHUNK_SIZE,
+                        rng: np.random.Generator = None, spin: float = 1):
+    """Run iter_spin_chain to completion and return the final per-analyzer counts."""
+    counts = empty_counts(len(analyzers), spin)
+    for _, counts in iter_spin_chain(analyzers, atoms, state, forget, chunk_size, rng, spin):
+        pass
+    return counts
+
+
+# --- Closed-form sampling --- #
+def sample_spin_chain(analyzers: list, atoms: int, state: np.ndarray = None,
+                      forget: bool = False, rng: np.random.Generator = None,
+                      spin: float = 1):
+    """Multinomial Markov-chain sampling over the 2j + 1 collapsed levels.
+
+    Level populations move between analyzers with transition matrix
+    |<next_m'|prev_m>|^2; a random (or forgotten) state hits every level
+    with probability 1 / (2j + 1).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    d = dimension(spin)
+    bases, filters = chain_settings(analyzers, spin)
+    counts = np.zeros((len(analyzers), d), dtype=np.int64)
+
+    uniform = np.full(d, 1 / d)
+    levels = None      # atoms per collapsed level after the previous analyzer
+    previous = None    # that analyzer's basis; None once the beam is forgotten
+    last = len(bases) - 1
+    for i, (basis, level) in enumerate(zip(bases, filters)):
+        if level == -1:
+            break
+
+        if levels is None:
+            if state is None:
+                probs = uniform
+            else:
+                probs = np.abs(basis.conj().T @ state)**2
+                probs /= probs.sum()
+            landed = rng.multinomial(atoms, probs)
+        elif previous is None:
+            landed = rng.multinomial(int(levels.sum()), uniform)
+        else:
+            transition = np.abs(basis.conj().T @ previous)**2
+            transition /= transition.sum(axis=0, keepdims=True)
+            landed = sum(rng.multinomial(n, transition[:, k]) for k, n in enumerate(levels))
+
+        # Apply filtering
+        if level is not None:
+            kept = np.zeros(d, dtype=np.int64)
+            kept[level] = landed[level]
+            landed = kept
+        counts[i] = landed
+        levels, previous = landed, basis
+
+        # Optional randomization between analyzers
+        if forget and i < last:
+            previous = None
+
+    return format_counts(counts, spin)
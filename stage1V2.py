@@ -1,100 +1,71 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import asyncio
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import asynccontextmanager
+from functools import partial
 import numpy as np
-import random
-import re
 from fastapi.middleware.cors import CORSMiddleware
+from admission import AdmissionController, Overloaded, estimate_cost, estimate_sweep_cost
+from bloch import iter_bloch_chain, iter_bloch_outcomes, simulate_bloch_group
+from coalescer import Coalescer, SingleFlight
+from ensemble import ensemble_chain
+from expressions import compile_expression, parse_amplitudes, parse_state
+from jobs import JobCancelled, JobManager
+from metrics import CONTENT_TYPE, REGISTRY, Collected, Counter, Histogram, MetricsMiddleware
+from rate_limit import ClientLimiter, RateLimited
+from responses import (
+    ARRAY_TYPES, NPZ, OCTET_STREAM, FastJSONResponse, array_response, dumps, npz_response,
+    preferred_type,
+)
+from result_cache import ResultCache, etag_for, request_key
+from spin_engine import (
+    CHUNK_SIZE, MAX_CHUNK_SIZE, SHARD_SIZE, add_counts, atom_uniforms, atom_width, basis_cache,
+    blocked_stage, chain_plan, filter_level, iter_chain, iter_chain_outcomes, iter_joint_chain,
+    iter_outcomes, iter_sharded_chain, joint_bins, joint_labels, plan_cache, plan_key, run_atoms,
+    run_key, sample_chain, shard_rng, shard_sizes, simulate_group, simulate_run, sweep_chain,
+)
+from spin_j import chain_settings as spin_chain_settings
+from spin_j import dimension, empty_counts, iter_spin_chain, sample_spin_chain
+from startup import profile
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in a worker thread so the port opens at once; /ready says when it is done
+    warming = asyncio.create_task(run_in_threadpool(warm_up))
+    yield
+    await warming
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
-app = FastAPI()
+ALLOWED_ORIGINS = [
+    "http://localhost:3000",
+    "https://stern-gerlach-demo.vercel.app",
+    "https://spin-interface.vercel.app",
+    "https://spin-interface-git-main-tomas-oconnells-projects.vercel.app",
+    "https://spin-interface-9hvn5fyxy-tomas-oconnells-projects.vercel.app",
+]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "https://stern-gerlach-demo.vercel.app",
-        "https://spin-interface.vercel.app",
-        "https://spin-interface-git-main-tomas-oconnells-projects.vercel.app",
-        "https://spin-interface-9hvn5fyxy-tomas-oconnells-projects.vercel.app",
-    ],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# --- Spin basis states --- #
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-
-X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-# --- General θ, φ analyzer states --- #
-def theta_plus(theta: float, phi: float = 0):
-    θ = np.radians(theta)
-    φ = np.radians(phi)
-    return np.array([
-        np.cos(θ / 2),
-        np.exp(1j * φ) * np.sin(θ / 2)
-    ], dtype=complex)
-
-def theta_minus(theta: float, phi: float = 0):
-    θ = np.radians(theta)
-    φ = np.radians(phi)
-    return np.array([
-        -np.exp(-1j * φ) * np.sin(θ / 2),
-        np.cos(θ / 2)
-    ], dtype=complex)
-
-# --- Random normalized spin state --- #
-def random_state():
-    vec = np.random.randn(2) + 1j * np.random.randn(2)
-    vec /= np.linalg.norm(vec)
-    return vec
-
-# --- Measurement function --- #
-def measure(state: np.ndarray, axis: str, theta: float = None, phi: float = 0):
-    if axis == "x":
-        probs = [abs(np.vdot(X_plus, state))**2, abs(np.vdot(X_minus, state))**2]
-        outcome = "up" if random.random() < probs[0] else "down"
-        return (X_plus if outcome == "up" else X_minus, outcome)
-
-    elif axis == "y":
-        probs = [abs(np.vdot(Y_plus, state))**2, abs(np.vdot(Y_minus, state))**2]
-        outcome = "up" if random.random() < probs[0] else "down"
-        return (Y_plus if outcome == "up" else Y_minus, outcome)
-
-    elif axis == "z":
-        probs = [abs(np.vdot(Z_plus, state))**2, abs(np.vdot(Z_minus, state))**2]
-        outcome = "up" if random.random() < probs[0] else "down"
-        return (Z_plus if outcome == "up" else Z_minus, outcome)
-
-    elif axis == "θ" or axis == "θφ":
-        if theta is None:
-            raise ValueError("Theta value must be provided for axis 'θ' or 'θφ'.")
-        T_plus = theta_plus(theta, phi)
-        T_minus = theta_minus(theta, phi)
-        probs = [abs(np.vdot(T_plus, state))**2, abs(np.vdot(T_minus, state))**2]
-        outcome = "up" if random.random() < probs[0] else "down"
-        return (T_plus if outcome == "up" else T_minus, outcome)
-
-    else:
-        raise ValueError("Invalid axis. Choose x, y, z, θ, or θφ.")
-
-# --- Expression converter for a, b inputs --- #
-def convert_expression(expr: str) -> str:
-    if not expr:
-        return expr
-    expr = re.sub(r"√\(([^)]+)\)", r"(\1)**0.5", expr)
-    expr = expr.replace("^", "**").replace("i", "j")
-    return expr
+app.add_middleware(MetricsMiddleware)
 
 # --- Input models --- #
 class AnalyzerInput(BaseModel):
     axis: str
-    filter: str = "both"   # up, down, both
+    filter: str = "both"   # up, down, both (or all)
     theta: float = None    # optional polar angle
     phi: float = 0         # ✅ new azimuthal angle (default 0°)
 
@@ -104,36 +75,959 @@ class MeasurementRequest(BaseModel):
     a: str = None
     b: str = None
     forget: bool = False
+    mode: str = "batch"    # batch (simulate every atom), multinomial or ensemble
+    seed: int = None       # optional, makes results reproducible and cacheable
+    chunk_size: int = CHUNK_SIZE   # atoms per vectorized pass / progress update
+    workers: int = None    # cap on worker processes for large sharded runs
+    spin: float = 0.5      # j = 1/2, 1, 3/2, ...; filters use the level names
+    amplitudes: list[str] = None   # initial state, m = +j ... -j (instead of a, b)
+    joint: bool = False    # also count every full outcome string (batch mode, spin 1/2)
+
+# Responses to seeded requests, keyed by a canonical hash of the request
+result_cache = ResultCache()
+
+def cache_key(req: MeasurementRequest) -> str:
+    # The worker cap never changes a seeded result, so it is not part of the
+    # key; the kernel backend does (see SPIN_BACKEND), so it is
+    return request_key({**req.model_dump(mode="json", exclude={"workers"}), "backend": BACKEND})
+
+def etag_matches(request: Request, etag: str) -> bool:
+    # In-process calls (no request, e.g. benchmark.py) never revalidate
+    if request is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+# --- Metrics --- #
+atoms_simulated = Counter("spin_atoms_simulated_total", "Atoms simulated, by mode", ("mode",))
+simulation_seconds = Counter("spin_simulation_seconds_total",
+                             "Wall time spent simulating, by mode", ("mode",))
+atoms_per_second = Histogram("spin_simulation_atoms_per_second",
+                             "Per-request simulation throughput, by mode", ("mode",),
+                             buckets=[10**k for k in range(3, 11)])
+analyzers_per_request = Histogram("spin_analyzers_per_request", "Analyzers in each simulated chain",
+                                  buckets=(1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50))
+request_errors = Counter("spin_errors_total", "Error responses by route and message",
+                         ("route", "error"))
+
+def cache_counts():
+    expressions = compile_expression.cache_info()
+    return {
+        "result": (result_cache.hits, result_cache.misses),
+        "basis": (basis_cache.hits, basis_cache.misses),
+        "plan": (plan_cache.hits, plan_cache.misses),
+        "expression": (expressions.hits, expressions.misses),
+    }
+
+def cache_hit_ratio():
+    return {(name,): hits / (hits + misses) if hits + misses else 0.0
+            for name, (hits, misses) in cache_counts().items()}
+
+Collected("spin_cache_hits_total", "Cache hits, by cache", "counter",
+          lambda: {(name,): hits for name, (hits, _) in cache_counts().items()}, ("cache",))
+Collected("spin_cache_misses_total", "Cache misses, by cache", "counter",
+          lambda: {(name,): misses for name, (_, misses) in cache_counts().items()}, ("cache",))
+Collected("spin_cache_hit_ratio", "Hits / lookups since start, by cache", "gauge",
+          cache_hit_ratio, ("cache",))
+
+def observe_simulation(mode: str, atoms: int, analyzers: int, seconds: float, requests: int = 1):
+    # Called once per finished request (or group), never from the chunk loop
+    atoms_simulated.labels(mode).inc(atoms)
+    simulation_seconds.labels(mode).inc(seconds)
+    if seconds > 0:
+        atoms_per_second.labels(mode).observe(atoms / seconds)
+    for _ in range(requests):
+        analyzers_per_request.observe(analyzers)
+
+def count_error(route: str, result: dict) -> dict:
+    if "error" in result:
+        request_errors.labels(route, result["error"]).inc()
+    return result
+
+# Joint histograms have 2^(k+1) - 1 bins for k analyzers
+MAX_JOINT_ANALYZERS = 16
+# Ensemble runs build (2j+1)^3 projector stacks per analyzer, so large j
+# gets expensive fast (about 0.04 s at j = 10, over a minute at j = 50)
+MAX_SPIN = float(os.environ.get("SPIN_MAX_SPIN", 10))
+
+def prepare_request(req: MeasurementRequest):
+    """Validate a request; returns (initial state or None, error dict or None)."""
+    if req.seed is not None and req.seed < 0:
+        return None, {"error": "Seed must be a non-negative integer"}
+    if req.atoms < 0:
+        return None, {"error": "atoms must be non-negative"}
+    if not 1 <= req.chunk_size <= MAX_CHUNK_SIZE:
+        return None, {"error": f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}"}
+    if req.workers is not None and req.workers < 1:
+        return None, {"error": "workers must be at least 1"}
+    if req.mode not in ("batch", "multinomial", "ensemble"):
+        return None, {"error": "Invalid mode. Choose batch, multinomial or ensemble."}
+    if req.spin > MAX_SPIN:
+        return None, {"error": f"Spin is limited to {MAX_SPIN:g}"}
+    try:
+        levels = dimension(req.spin)
+    except ValueError as exc:
+        return None, {"error": str(exc)}
+    if req.joint and (req.mode != "batch" or levels != 2):
+        return None, {"error": "joint needs batch mode and spin 1/2"}
+    if req.joint and len(req.analyzers) > MAX_JOINT_ANALYZERS:
+        return None, {"error": f"joint is limited to {MAX_JOINT_ANALYZERS} analyzers"}
+    # Unknown axes and missing angles are caught here, before a batch starts streaming
+    try:
+        if levels == 2:
+            chain_plan(req.analyzers, req.forget)
+        else:
+            spin_chain_settings(req.analyzers, req.spin)
+    except ValueError as exc:
+        return None, {"error": str(exc)}
+
+    # Initialize state (shared by every atom when amplitudes or a, b are given)
+    if req.amplitudes:
+        if len(req.amplitudes) != levels:
+            return None, {"error": f"Spin {req.spin} needs {levels} amplitudes"}
+        try:
+            return parse_amplitudes(req.amplitudes), None
+        except ValueError:
+            return None, {"error": "Invalid amplitudes"}
+    if req.a and req.b:
+        if levels != 2:
+            return None, {"error": "a/b only apply to spin 1/2; use amplitudes"}
+        try:
+            return parse_state(req.a, req.b), None
+        except ValueError:
+            return None, {"error": "Invalid a/b values"}
+    return None, None
+
+def format_joint(histogram: np.ndarray, n_analyzers: int) -> dict:
+    """Non-empty joint histogram bins by outcome string (see spin_engine.joint_labels)."""
+    return {label: n for label, n in zip(joint_labels(n_analyzers), histogram.tolist()) if n}
+
+def iter_joint_request(req: MeasurementRequest, state):
+    """iter_request's batch branch plus the joint histogram, over the same shards."""
+    entropy = req.seed if req.seed is not None else np.random.SeedSequence().entropy
+    counts = empty_counts(len(req.analyzers), req.spin)
+    histogram = np.zeros(joint_bins(len(req.analyzers)), dtype=np.int64)
+    done = 0
+    for index, n in enumerate(shard_sizes(req.atoms)):
+        for shard_done, shard_counts, shard_histogram in iter_joint_chain(
+                req.analyzers, n, state, req.forget, req.chunk_size, shard_rng(entropy, index),
+                kernel=spin_half_outcomes):
+            if done + shard_done < req.atoms:
+                running = add_counts([dict(c) for c in counts], shard_counts)
+                yield {"atoms_done": done + shard_done, "atoms": req.atoms, "results": running}
+        add_counts(counts, shard_counts)
+        histogram += shard_histogram
+        done += n
+    yield {"results": counts, "joint": format_joint(histogram, len(req.analyzers))}
+
+# Spin-1/2 batch kernel: "state" (complex amplitudes) or "bloch" (real Bloch
+# vectors; faster and lighter, but seeded runs draw different atoms). Set per
+# deployment with SPIN_BACKEND so seeded results stay stable within one.
+# Every spin-1/2 path (counts, joint histograms, outcome exports, grouped
+# runs) uses the selected backend, so they agree with each other for a seed.
+BACKENDS = {
+    "state": (iter_chain, iter_outcomes, simulate_group),
+    "bloch": (iter_bloch_chain, iter_bloch_outcomes, simulate_bloch_group),
+}
+BACKEND = os.environ.get("SPIN_BACKEND", "state")
+if BACKEND not in BACKENDS:
+    raise ValueError(f"SPIN_BACKEND must be one of {', '.join(BACKENDS)}, not {BACKEND!r}")
+spin_half_chain, spin_half_outcomes, spin_half_group = BACKENDS[BACKEND]
+
+def chain_kernels(req: MeasurementRequest):
+    """(chunked iterator, closed-form sampler) for the request's spin."""
+    if req.spin == 0.5:
+        return spin_half_chain, sample_chain
+    return (partial(iter_spin_chain, spin=req.spin),
+            partial(sample_spin_chain, spin=req.spin))
+
+def iter_request(req: MeasurementRequest):
+    """Yield running counts after each chunk, then the final response dict."""
+    state, error = prepare_request(req)
+    if error:
+        yield error
+        return
+
+    chain, sampler = chain_kernels(req)
+    counts = empty_counts(len(req.analyzers), req.spin)
+    if req.mode == "ensemble":
+        counts, probabilities = ensemble_chain(req.analyzers, req.atoms, state=state,
+                                               forget=req.forget, spin=req.spin,
+                                               rng=np.random.default_rng(req.seed))
+        yield {"results": counts, "probabilities": probabilities}
+        return
+    elif req.mode == "multinomial":
+        counts = sampler(req.analyzers, req.atoms, state=state, forget=req.forget,
+                         rng=np.random.default_rng(req.seed))
+    elif req.joint:
+        yield from iter_joint_request(req, state)
+        return
+    else:
+        chunks = iter_sharded_chain(req.analyzers, req.atoms, state=state, forget=req.forget,
+                                    chunk_size=req.chunk_size, entropy=req.seed, chain=chain)
+        for done, counts in chunks:
+            if done < req.atoms:
+                yield {"atoms_done": done, "atoms": req.atoms, "results": counts}
+    yield {"results": counts}
+
+def simulate_request(req: MeasurementRequest):
+    for result in iter_request(req):
+        pass
+    return result
+
+# --- Process-pool jobs --- #
+# Requests costing more than this many atom-measurements leave the request thread
+SYNC_COST_LIMIT = 2_000_000
+
+def request_cost(req: MeasurementRequest) -> int:
+    return req.atoms * max(len(req.analyzers), 1)
+
+def run_job(payload: dict, job_id: str, progress, cancelled):
+    """Worker-process entry point; reports progress and honours cancellation."""
+    req = MeasurementRequest(**payload)
+    for result in iter_request(req):
+        if "atoms_done" in result:
+            progress[job_id] = result["atoms_done"]
+            if cancelled.get(job_id):
+                raise JobCancelled(job_id)
+    return result
+
+def run_shard(payload: dict, entropy: int, index: int, atoms: int):
+    """Worker-process entry point for one shard of a sharded run."""
+    req = MeasurementRequest(**payload)
+    state, _ = prepare_request(req)
+    chain, _ = chain_kernels(req)
+    counts = empty_counts(len(req.analyzers), req.spin)
+    for _, counts in chain(req.analyzers, atoms, state, req.forget, req.chunk_size,
+                           shard_rng(entropy, index)):
+        pass
+    return counts
+
+def run_joint_shard(payload: dict, entropy: int, index: int, atoms: int):
+    """run_shard for joint requests; returns (counts, joint histogram)."""
+    req = MeasurementRequest(**payload)
+    state, _ = prepare_request(req)
+    counts = empty_counts(len(req.analyzers), req.spin)
+    histogram = np.zeros(joint_bins(len(req.analyzers)), dtype=np.int64)
+    for _, counts, histogram in iter_joint_chain(req.analyzers, atoms, state, req.forget,
+                                                 req.chunk_size, shard_rng(entropy, index),
+                                                 kernel=spin_half_outcomes):
+        pass
+    return counts, histogram
+
+job_manager = JobManager(run_job)
+
+def simulate_sharded(req: MeasurementRequest):
+    """Spread a batch run's shards over up to req.workers pool processes.
+
+    Shard streams come from SeedSequence(seed), so the reduced counts equal
+    simulate_request's for any worker count.
+    """
+    _, error = prepare_request(req)
+    if error:
+        return error
+
+    entropy = req.seed if req.seed is not None else np.random.SeedSequence().entropy
+    payload = req.model_dump(exclude_none=True)
+    shards = [(payload, entropy, index, n) for index, n in enumerate(shard_sizes(req.atoms))]
+
+    counts = empty_counts(len(req.analyzers), req.spin)
+    if req.joint:
+        histogram = np.zeros(joint_bins(len(req.analyzers)), dtype=np.int64)
+        for shard_counts, shard_histogram in job_manager.map(run_joint_shard, shards,
+                                                             max_workers=req.workers):
+            add_counts(counts, shard_counts)
+            histogram += shard_histogram
+        return {"results": counts, "joint": format_joint(histogram, len(req.analyzers))}
+    for shard_counts in job_manager.map(run_shard, shards, max_workers=req.workers):
+        add_counts(counts, shard_counts)
+    return {"results": counts}
+
+def compute(req: MeasurementRequest):
+    start = time.perf_counter()
+    # Short or closed-form requests stay on the synchronous fast path
+    if req.mode != "batch" or request_cost(req) <= SYNC_COST_LIMIT:
+        result = simulate_request(req)
+    else:
+        result = simulate_sharded(req)
+    if "error" not in result:
+        observe_simulation(req.mode, req.atoms, len(req.analyzers), time.perf_counter() - start)
+    return result
+
+# --- Admission control --- #
+# Atom-measurements allowed in flight per server process, how many requests
+# may queue (for at most SPIN_MAX_WAIT seconds) once that is used up, and the
+# most one request may cost (0: the whole budget; bigger runs go to /jobs)
+admission = AdmissionController(
+    budget=float(os.environ.get("SPIN_COST_BUDGET", 20_000_000)),
+    max_queue=int(os.environ.get("SPIN_MAX_QUEUE", 64)),
+    max_wait=float(os.environ.get("SPIN_MAX_WAIT", 10)),
+    max_cost=float(os.environ.get("SPIN_MAX_COST", 0)) or None,
+)
+admission_rejections = Counter("spin_admission_rejections_total",
+                               "Requests turned away by admission control, by status", ("status",))
+Collected("spin_admission_in_flight_cost", "Estimated atom-measurements being simulated", "gauge",
+          lambda: {(): admission.stats()["in_flight"]})
+Collected("spin_admission_queued", "Requests waiting for simulation capacity", "gauge",
+          lambda: {(): admission.stats()["queued"]})
+
+# --- Per-client rate limits --- #
+# Every client (a known frontend Origin, otherwise the client IP) gets a
+# token bucket refilled with SPIN_CLIENT_RATE atom-measurements per second
+# (0 turns the limit off).
+# SPIN_RATE_LIMITS overrides that per client as JSON, e.g.
+#   {"https://spin-interface.vercel.app": {"rate": 2e7, "burst": 2e8}, "ip:10.0.0.5": {...}}
+def load_rate_limits() -> dict:
+    limits = json.loads(os.environ.get("SPIN_RATE_LIMITS", "{}"))
+    return {client: (float(limit["rate"]), float(limit["burst"])) for client, limit in limits.items()}
+
+rate_limiter = ClientLimiter(
+    rate=float(os.environ.get("SPIN_CLIENT_RATE", 10_000_000)),
+    burst=float(os.environ.get("SPIN_CLIENT_BURST", 100_000_000)),
+    limits=load_rate_limits(),
+)
+rate_limited = Counter("spin_rate_limited_total", "Requests refused by the per-client rate limit",
+                       ("client",))
+
+def client_key(request: Request) -> str:
+    """Origin for the known frontends, client IP for everyone else.
+
+    In-process calls (no request, e.g. benchmark.py) are not rate limited.
+    """
+    if request is None:
+        return None
+    origin = request.headers.get("origin")
+    if origin in ALLOWED_ORIGINS or origin in rate_limiter.limits:
+        return origin
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+def measurement_cost(req: MeasurementRequest) -> float:
+    return estimate_cost(req.analyzers, req.atoms, req.mode, req.spin, req.forget)
+
+async def acquire_slot(cost: float, request: Request, charge: float = None):
+    """Charge the client's rate limit and wait for simulation capacity.
+
+    Callers validate the request first, so malformed requests cost nothing.
+
+    `charge` is what the request holds against the admission budget if not
+    its full `cost`. Returns a release function (safe to call twice, from
+    any thread); call it with completed=True once the work has finished, so
+    only finished work feeds the throughput estimate. Raises 429 / 503 with Retry-After when the client is over
+    its rate or the server is full, and 413 when the request is too large
+    to run outside /jobs. Waiting requests are admitted round-robin across
+    clients, and wait on the event loop: a queued request holds no
+    threadpool thread until it is admitted and handed to run_in_threadpool.
+    """
+    client = client_key(request)
+    if client is not None:
+        try:
+            rate_limiter.take(client, cost)
+        except RateLimited as exc:
+            rate_limited.labels("ip" if client.startswith("ip:") else client).inc()
+            raise HTTPException(status_code=429, detail=str(exc),
+                                headers={"Retry-After": str(exc.retry_after)}) from None
+    try:
+        charge = await admission.acquire_async(cost if charge is None else charge, client or "")
+    except asyncio.CancelledError:
+        if client is not None:
+            rate_limiter.refund(client, cost)
+        raise
+    except Overloaded as exc:
+        # Nothing ran, so the client gets its tokens back
+        if client is not None:
+            rate_limiter.refund(client, cost)
+        admission_rejections.labels(exc.status).inc()
+        headers = None if exc.retry_after is None else {"Retry-After": str(exc.retry_after)}
+        raise HTTPException(status_code=exc.status, detail=str(exc), headers=headers) from None
+    start = time.perf_counter()
+    once = threading.Lock()
+
+    def release(completed: bool = False):
+        if once.acquire(blocking=False):
+            if completed:
+                admission.release(charge, cost, time.perf_counter() - start)
+            else:
+                admission.release(charge)
+    return release
+
+@asynccontextmanager
+async def admitted(cost: float, request: Request):
+    release = await acquire_slot(cost, request)
+    try:
+        yield
+    except BaseException:
+        release()
+        raise
+    release(completed=True)
+
+# --- Response formats --- #
+def counts_array(results: list) -> np.ndarray:
+    """(analyzers, levels) int64 counts; the level order is the result dicts' key order."""
+    levels = list(results[0]) if results else []
+    return np.array([[counts[level] for level in levels] for counts in results],
+                    dtype=np.int64).reshape(len(results), len(levels))
+
+def negotiated(result: dict, media_type: str, counts: np.ndarray = None, headers: dict = None):
+    """`result` as JSON, or its counts as a .npy file / raw buffer.
+
+    Array responses name the outcome levels (last axis) in X-Levels.
+    """
+    headers = {"Vary": "Accept", **(headers or {})}
+    if media_type not in ARRAY_TYPES:
+        return FastJSONResponse(result, headers=headers)
+    if counts is None:
+        counts = counts_array(result["results"])
+        headers["X-Levels"] = ",".join(result["results"][0]) if result["results"] else ""
+    return array_response(counts, media_type, headers)
 
 # --- Main measurement endpoint --- #
 @app.post("/measurements")
-def run_measurements(req: MeasurementRequest):
-    counts = [{"up": 0, "down": 0} for _ in req.analyzers]
-
-    for _ in range(req.atoms):
-        # Initialize state
-        if req.a and req.b:
-            try:
-                a = complex(eval(convert_expression(req.a)))
-                b = complex(eval(convert_expression(req.b)))
-                state = np.array([a, b], dtype=complex)
-                state /= np.linalg.norm(state)
-            except Exception:
-                return {"error": "Invalid a/b values"}
+async def run_measurements(req: MeasurementRequest, request: Request):
+    """Counts per analyzer as JSON, or as an int64 (analyzers, levels) array for
+    Accept: application/x-npy (a .npy file) or application/octet-stream (raw).
+    """
+    media_type = preferred_type(request)
+    _, error = prepare_request(req)
+    if error:
+        return count_error("/measurements", error)
+    if req.seed is None:
+        async with admitted(measurement_cost(req), request):
+            result = await coalesced_compute(req)
+        if "error" in result:
+            return count_error("/measurements", result)
+        return negotiated(result, media_type)
+
+    # Seeded runs are deterministic, so identical requests share one result;
+    # each representation gets its own ETag
+    key = cache_key(req)
+    etag = etag_for(key) if media_type not in ARRAY_TYPES else etag_for(request_key([key, media_type]))
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+
+    result = result_cache.get(key) if key in result_cache else None
+    if result is None:
+        # Identical seeded requests in flight together are simulated once
+        result = await flights.do(key, partial(admitted_compute, req, key, request))
+    if "error" in result:
+        return count_error("/measurements", result)
+    return negotiated(result, media_type, headers={"ETag": etag} if request is not None else None)
+
+async def admitted_compute(req: MeasurementRequest, key: str, request: Request):
+    async with admitted(measurement_cost(req), request):
+        return await run_in_threadpool(cached_compute, req, key)
+
+def cached_compute(req: MeasurementRequest, key: str):
+    result = result_cache.get(key)
+    if result is None:
+        result = compute(req)
+        if "error" not in result:
+            result_cache.put(key, result)
+    return result
+
+# --- Grouped simulation --- #
+def chain_key(req: MeasurementRequest) -> tuple:
+    return plan_key(req.analyzers, req.forget)
+
+def groupable(req: MeasurementRequest) -> bool:
+    """Unseeded, small spin-1/2 batch runs can share one grouped pass (spin_half_group)."""
+    return (req.seed is None and req.mode == "batch" and req.spin == 0.5 and not req.joint
+            and request_cost(req) <= SYNC_COST_LIMIT)
+
+def run_group(members: list) -> list:
+    """Simulate (request, initial state) pairs with one chain together; one result each."""
+    first = members[0][0]
+    start = time.perf_counter()
+    results = spin_half_group(first.analyzers,
+                              [req.atoms for req, _ in members],
+                              [state for _, state in members],
+                              forget=first.forget, chunk_size=first.chunk_size)
+    observe_simulation("batch", sum(req.atoms for req, _ in members),
+                       len(first.analyzers), time.perf_counter() - start, len(members))
+    return [{"results": counts} for counts in results]
+
+# Concurrent /measurements requests for the same chain are coalesced: while
+# others are in flight, a request waits up to SPIN_COALESCE_WINDOW seconds
+# (0 turns coalescing off) for up to SPIN_COALESCE_MAX requests to join it.
+# Only small requests qualify; above this cost the kernel time dwarfs the
+# per-request overhead a group saves, and members would wait on each other.
+COALESCE_COST_LIMIT = 20_000
+
+coalescer = Coalescer(
+    partial(run_in_threadpool, run_group),
+    window=float(os.environ.get("SPIN_COALESCE_WINDOW", 0.002)),
+    max_size=int(os.environ.get("SPIN_COALESCE_MAX", 64)),
+)
+flights = SingleFlight()
+Collected("spin_coalesced_requests_total",
+          "Requests that shared another request's simulation, by kind", "counter",
+          lambda: {("grouped",): coalescer.joined, ("single_flight",): flights.shared},
+          ("kind",))
+
+async def coalesced_compute(req: MeasurementRequest):
+    """compute(), run together with concurrent requests for the same chain when possible."""
+    state, error = prepare_request(req)
+    if (error or not groupable(req) or request_cost(req) > COALESCE_COST_LIMIT
+            or coalescer.window <= 0):
+        return await run_in_threadpool(compute, req)
+    return await coalescer.submit(chain_key(req), (req, state))
+
+# --- Batch endpoint --- #
+def iter_batch(reqs: list[MeasurementRequest], prepared: list):
+    """Yield (index, result) for every request as soon as it is done.
+
+    `prepared` holds prepare_request's (state, error) for each request.
+
+    Unseeded, small batch-mode requests with the same analyzer chain and
+    forget flag run together in one spin_half_group pass. Seeded,
+    multinomial and large requests go through the usual single-request path.
+    """
+    groups = {}   # chain key -> [(index, request, initial state)]
+    for index, (req, (state, error)) in enumerate(zip(reqs, prepared)):
+        if error:
+            yield index, error
+        elif groupable(req):
+            groups.setdefault(chain_key(req), []).append((index, req, state))
+        elif req.seed is None:
+            yield index, compute(req)
         else:
-            state = random_state()
+            yield index, cached_compute(req, cache_key(req))
+
+    for members in groups.values():
+        results = run_group([(req, state) for _, req, state in members])
+        for (index, _, _), result in zip(members, results):
+            yield index, result
+
+@app.post("/measurements/batch")
+async def run_batch(reqs: list[MeasurementRequest], request: Request):
+    """NDJSON stream with one {"index": i, ...} line per request, as each finishes."""
+    # The whole batch is admitted up front, before the 200 response starts;
+    # invalid members are answered with their error and cost nothing
+    prepared = [prepare_request(req) for req in reqs]
+    cost = sum(measurement_cost(req) for req, (_, error) in zip(reqs, prepared) if not error)
+    release = await acquire_slot(cost, request)
+
+    def lines():
+        try:
+            for index, result in iter_batch(reqs, prepared):
+                count_error("/measurements/batch", result)
+                yield dumps({"index": index, **result}) + b"\n"
+            release(completed=True)
+        finally:
+            release()
+
+    # The background task covers clients that disconnect before the stream starts
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             background=BackgroundTask(release))
+
+
+@app.post("/jobs")
+async def create_job(req: MeasurementRequest, request: Request):
+    """Queue a run on the worker pool; poll GET /jobs/{id} for progress and the result.
 
+    Jobs are charged to the client's rate limit like /measurements but have
+    no per-request cost limit: a job runs in one pool worker, so it holds at
+    most one share of the admission budget (split between the workers and
+    this process) until it finishes, and a huge job cannot turn away
+    everything else.
+    """
+    _, error = prepare_request(req)
+    if error:
+        return count_error("/jobs", error)
+    cost = measurement_cost(req)
+    release = await acquire_slot(cost, request,
+                                 charge=min(cost, admission.budget / (job_manager.max_workers + 1)))
+    try:
+        # The first job starts the process pool, which takes a while. Jobs are
+        # not timed for the throughput estimate (on_done calls release() with
+        # no arguments): their time includes waiting for a worker.
+        job_id = await run_in_threadpool(job_manager.submit, req.model_dump(exclude_none=True),
+                                         atoms=req.atoms, on_done=release)
+    except BaseException:
+        release()
+        raise
+    return await run_in_threadpool(job_manager.status, job_id)
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    info = job_manager.status(job_id)
+    if info is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return info
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_manager.status(job_id)
+
+# --- θ/φ sweep endpoint --- #
+# Largest θ × φ grid a single sweep may request (a full 360 × 181 grid fits)
+MAX_SWEEP_POINTS = 100_000
+
+class SweepRequest(BaseModel):
+    analyzers: list[AnalyzerInput]
+    sweep: int = 0             # index of the analyzer whose θ, φ are swept
+    theta_start: float = 0
+    theta_stop: float = 180
+    theta_steps: int = 181
+    phi_start: float = 0
+    phi_stop: float = 0
+    phi_steps: int = 1
+    atoms: int
+    a: str = None
+    b: str = None
+    forget: bool = False
+    seed: int = None
+
+@app.post("/sweep")
+async def run_sweep(req: SweepRequest, request: Request):
+    """Counts and exact probabilities for every point of a θ (× φ) grid.
+
+    The swept analyzer measures along θφ at each grid point and keeps its
+    filter. Grids are indexed [θ][φ]. Accept: application/x-npy or
+    application/octet-stream returns just the counts, as an int64
+    (analyzers, 2, θ, φ) array.
+    """
+    _, error = prepare_sweep(req)
+    if error:
+        return count_error("/sweep", error)
+    cost = estimate_sweep_cost(req.analyzers, req.theta_steps * req.phi_steps)
+    async with admitted(cost, request):
+        return await run_in_threadpool(sweep_response, req, request)
+
+def sweep_response(req: SweepRequest, request: Request):
+    result = sweep(req)
+    if "error" in result:
+        return count_error("/sweep", result)
+    media_type = preferred_type(request)
+    if media_type not in ARRAY_TYPES:
+        return negotiated(result, media_type)
+    counts = np.array([[r["up"], r["down"]] for r in result["results"]], dtype=np.int64)
+    return negotiated(result, media_type, counts=counts, headers={"X-Levels": "up,down"})
+
+def prepare_sweep(req: SweepRequest):
+    """Validate a sweep; returns (initial state or None, error dict or None)."""
+    if not 0 <= req.sweep < len(req.analyzers):
+        return None, {"error": "sweep must be the index of one of the analyzers"}
+    if req.theta_steps < 1 or req.phi_steps < 1:
+        return None, {"error": "theta_steps and phi_steps must be at least 1"}
+    if req.theta_steps * req.phi_steps > MAX_SWEEP_POINTS:
+        return None, {"error": f"Sweeps are limited to {MAX_SWEEP_POINTS} grid points"}
+    if req.atoms < 0 or (req.seed is not None and req.seed < 0):
+        return None, {"error": "atoms and seed must be non-negative"}
+    # The swept analyzer measures along θφ; the others must resolve as given
+    try:
         for i, an in enumerate(req.analyzers):
-            state, outcome = measure(state, an.axis, theta=an.theta, phi=an.phi)
+            if i != req.sweep:
+                basis_cache.get(an.axis, an.theta, an.phi)
+    except ValueError as exc:
+        return None, {"error": str(exc)}
 
-            # Apply filtering
-            if an.filter != "both" and outcome != an.filter:
-                break
+    state = None
+    if req.a and req.b:
+        try:
+            state = parse_state(req.a, req.b)
+        except ValueError:
+            return None, {"error": "Invalid a/b values"}
+    return state, None
 
-            counts[i][outcome] += 1
+def sweep(req: SweepRequest):
+    state, error = prepare_sweep(req)
+    if error:
+        return error
 
-            # Optional randomization between analyzers
-            if req.forget and i < len(req.analyzers) - 1:
-                state = random_state()
+    thetas = np.linspace(req.theta_start, req.theta_stop, req.theta_steps)
+    phis = np.linspace(req.phi_start, req.phi_stop, req.phi_steps)
+    start = time.perf_counter()
+    try:
+        counts, probs = sweep_chain(req.analyzers, req.sweep, thetas, phis, req.atoms,
+                                    state=state, forget=req.forget,
+                                    rng=np.random.default_rng(req.seed))
+    except ValueError as exc:
+        return {"error": str(exc)}
+    observe_simulation("sweep", req.atoms * len(thetas) * len(phis), len(req.analyzers),
+                       time.perf_counter() - start)
 
-    return {"results": counts}
+    # Arrays are left as NumPy views; FastJSONResponse writes them directly
+    return {
+        "theta": thetas,
+        "phi": phis,
+        "results": [
+            {"up": counts[i, 0], "down": counts[i, 1], "p_up": probs[i, 0], "p_down": probs[i, 1]}
+            for i in range(len(req.analyzers))
+        ],
+    }
+
+# --- Streaming measurement endpoint --- #
+def format_event(result: dict, sse: bool) -> bytes:
+    line = dumps(result)
+    return b"data: " + line + b"\n\n" if sse else line + b"\n"
+
+@app.post("/measurements/stream")
+async def stream_measurements(req: MeasurementRequest, request: Request):
+    """NDJSON (or Server-Sent Events) stream of running counts per chunk.
+
+    The last line is the same body /measurements would return.
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    _, error = prepare_request(req)
+    key = cache_key(req) if req.seed is not None and not error else None
+    # Errors and cached results are sent as the only line, without admission
+    cached = count_error("/measurements/stream", error) if error else None
+    if key:
+        cached = result_cache.get(key)
+    if cached is not None:
+        release = None
+    else:
+        release = await acquire_slot(measurement_cost(req), request)
+
+    def events():
+        if cached is not None:
+            yield format_event(cached, sse)
+            return
+        try:
+            start = time.perf_counter()
+            for result in iter_request(req):
+                yield format_event(result, sse)
+            if "error" in result:
+                count_error("/measurements/stream", result)
+                return
+            observe_simulation(req.mode, req.atoms, len(req.analyzers),
+                               time.perf_counter() - start)
+            release(completed=True)
+            if key:
+                result_cache.put(key, result)
+        finally:
+            release()
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    background = BackgroundTask(release) if release else None
+    return StreamingResponse(events(), media_type=media_type, background=background)
+
+# --- Per-atom outcome export --- #
+# Largest run assembled in memory as .npz (1e8 atoms x 5 analyzers is ~63 MB);
+# raw streams are written block by block and only bounded by admission control
+MAX_NPZ_ATOMS = 10**8
+
+def prepare_per_atom(req: MeasurementRequest):
+    """Validate a per-atom request; returns (initial state or None, error dict or None)."""
+    state, error = prepare_request(req)
+    if error:
+        return None, error
+    if req.mode != "batch" or req.spin != 0.5:
+        return None, {"error": "Per-atom results need batch mode and spin 1/2"}
+    if any(filter_level(an.filter) == -1 for an in req.analyzers):
+        return None, {"error": "Filters must be up, down, both or all"}
+    return state, None
+
+@app.post("/measurements/outcomes")
+async def export_outcomes(req: MeasurementRequest, request: Request):
+    """Every atom's outcome at every analyzer, one bit each.
+
+    The outcomes form a uint8 (ceil(atoms / 8), analyzers) array: bit j of
+    row b (little-endian bit order) is 1 if atom 8b + j measured "up" at
+    that analyzer. Bits after the analyzer that blocked an atom are 0, so
+    "blocked at stage k" follows from the bits and the filters; see
+    spin_engine.unpack_outcomes and blocked_stage. A seeded export is the
+    same run /measurements simulates for that request on this server: same
+    chunk_size, same kernel backend (SPIN_BACKEND).
+
+    Returns an .npz with `outcomes`, `counts` ([up, down] per analyzer),
+    `filters` and `seed` (default), or for Accept: application/octet-stream
+    the raw outcome bytes streamed as they are simulated.
+    """
+    state, error = prepare_per_atom(req)
+    if error:
+        return count_error("/measurements/outcomes", error)
+    media_type = preferred_type(request, (NPZ, OCTET_STREAM))
+    if media_type == NPZ and req.atoms > MAX_NPZ_ATOMS:
+        return count_error("/measurements/outcomes", {
+            "error": f".npz exports are limited to {MAX_NPZ_ATOMS} atoms; "
+                     "request application/octet-stream to stream larger runs"})
+
+    # Unseeded runs get fresh entropy, reported so they can be regenerated
+    seed = req.seed if req.seed is not None else np.random.SeedSequence().entropy
+    filters = [an.filter for an in req.analyzers]
+    blocks = iter_chain_outcomes(req.analyzers, req.atoms, state=state, forget=req.forget,
+                                 chunk_size=req.chunk_size, entropy=seed,
+                                 kernel=spin_half_outcomes)
+    headers = {"X-Seed": str(seed), "X-Atoms": str(req.atoms), "X-Filters": ",".join(filters)}
+
+    if media_type == NPZ:
+        async with admitted(measurement_cost(req), request):
+            return await run_in_threadpool(outcomes_npz, req, blocks, seed, headers)
+
+    release = await acquire_slot(measurement_cost(req), request)
+
+    def chunks():
+        try:
+            start = time.perf_counter()
+            for packed, _ in blocks:
+                yield packed.tobytes()
+            observe_simulation("outcomes", req.atoms, len(req.analyzers),
+                               time.perf_counter() - start)
+            release(completed=True)
+        finally:
+            release()
+
+    headers.update({"X-Array-Dtype": "|u1",
+                    "X-Array-Shape": f"{(req.atoms + 7) // 8},{len(req.analyzers)}"})
+    return StreamingResponse(chunks(), media_type=OCTET_STREAM, headers=headers,
+                             background=BackgroundTask(release))
+
+def outcomes_npz(req: MeasurementRequest, blocks, seed: int, headers: dict):
+    """Assemble an export's packed blocks into the .npz response."""
+    start = time.perf_counter()
+    outcomes = np.empty(((req.atoms + 7) // 8, len(req.analyzers)), dtype=np.uint8)
+    counts = np.zeros((len(req.analyzers), 2), dtype=np.int64)
+    row = 0
+    for packed, block_counts in blocks:
+        outcomes[row:row + len(packed)] = packed
+        row += len(packed)
+        counts += block_counts
+    observe_simulation("outcomes", req.atoms, len(req.analyzers), time.perf_counter() - start)
+    filters = [an.filter for an in req.analyzers]
+    return npz_response({"outcomes": outcomes, "counts": counts, "filters": np.array(filters),
+                         "seed": np.array(str(seed))}, "outcomes.npz", headers)
+
+# --- Counter-based runs --- #
+# A run is stored as its request only; its atoms are regenerated from the
+# Philox stream on demand (see spin_engine.simulate_run)
+runs = ResultCache(max_entries=10_000, max_bytes=16 * 1024 * 1024)
+MAX_ATOM_PAGE = 1_000
+
+def run_range(payload: dict, start: int, atoms: int):
+    """Worker-process entry point: counts of one range of a run's atoms."""
+    req = MeasurementRequest(**payload)
+    state, _ = prepare_request(req)
+    return simulate_run(req.analyzers, atoms, req.seed, state=state, forget=req.forget,
+                        start=start, chunk_size=req.chunk_size)
+
+def run_counts(req: MeasurementRequest, state):
+    if request_cost(req) <= SYNC_COST_LIMIT:
+        return simulate_run(req.analyzers, req.atoms, req.seed, state=state, forget=req.forget,
+                            chunk_size=req.chunk_size)
+    # Any range of atoms can be simulated on its own, so shards need no extra seeding
+    payload = req.model_dump(exclude_none=True)
+    ranges = [(payload, index * SHARD_SIZE, n) for index, n in enumerate(shard_sizes(req.atoms))]
+    return sum(job_manager.map(run_range, ranges, max_workers=req.workers))
+
+@app.post("/runs")
+async def create_run(req: MeasurementRequest, request: Request):
+    """Simulate a run whose every atom can later be inspected via /runs/{id}/atoms.
+
+    Atom i's initial state and outcomes come from its own block of a
+    Philox stream keyed by the run seed, so pages are recomputed exactly,
+    in time proportional to the page size, and match these counts.
+    Unseeded runs get a random seed, returned with the run.
+    """
+    state, error = prepare_per_atom(req)
+    if error:
+        return count_error("/runs", error)
+    if req.seed is None:
+        req = req.model_copy(update={"seed": secrets.randbits(63)})
+
+    # chunk_size and workers never change a run, so they are not part of its id
+    run_id = request_key(req.model_dump(mode="json", exclude={"chunk_size", "workers"}))[:24]
+    run = runs.get(run_id)
+    if run is None:
+        async with admitted(measurement_cost(req), request):
+            start = time.perf_counter()
+            counts = await run_in_threadpool(run_counts, req, state)
+            observe_simulation("run", req.atoms, len(req.analyzers), time.perf_counter() - start)
+        run = {"id": run_id, "seed": req.seed, "atoms": req.atoms,
+               "results": [{"up": int(up), "down": int(down)} for up, down in counts],
+               "request": req.model_dump(exclude_none=True, exclude={"chunk_size", "workers"})}
+        runs.put(run_id, run)
+    return {key: value for key, value in run.items() if key != "request"}
+
+@app.get("/runs/{run_id}/atoms")
+def get_run_atoms(run_id: str, offset: int = Query(0, ge=0),
+                  limit: int = Query(100, ge=1, le=MAX_ATOM_PAGE)):
+    """Initial Bloch angles (degrees) and outcomes of atoms offset ... offset + limit - 1.
+
+    Outcomes are "up" / "down" per analyzer, null after the analyzer that
+    blocked the atom (`blocked_at`, null if it passed every filter).
+    """
+    run = runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found; POST it to /runs again")
+    req = MeasurementRequest(**run["request"])
+    state, _ = prepare_request(req)
+    count = max(min(limit, req.atoms - offset), 0)
+
+    plan = chain_plan(req.analyzers, req.forget)
+    k = len(plan.bases)
+    uniforms = atom_uniforms(run_key(req.seed), offset, count, atom_width(k))
+    initial, outcomes = run_atoms(plan, uniforms, state)
+    stage = blocked_stage(outcomes, plan.filters)
+    theta = np.degrees(2 * np.arccos(np.clip(np.abs(initial[:, 0]), 0, 1)))
+    phi = np.degrees(np.angle(initial[:, 1]) - np.angle(initial[:, 0])) % 360
+
+    atoms = []
+    for j in range(count):
+        reached = int(stage[j])
+        atoms.append({
+            "index": offset + j,
+            "theta": float(theta[j]),
+            "phi": float(phi[j]),
+            "outcomes": ["up" if outcomes[i, j] else "down" if i <= reached else None
+                         for i in range(k)],
+            "blocked_at": reached if reached < k else None,
+        })
+    return {"id": run_id, "offset": offset, "atoms": atoms}
+
+# --- Metrics endpoint --- #
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of the request, simulation and cache metrics."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+# --- Warm-up and readiness --- #
+# Render spins idle instances down, so the first request after a cold start
+# would otherwise pay for filling the basis / spin-j caches, the first NumPy
+# calls of every kernel and building the OpenAPI schema.
+WARM_UP = os.environ.get("SPIN_WARM_UP", "1") != "0"
+WARM_UP_ANALYZERS = [
+    {"axis": "z"},
+    {"axis": "x", "filter": "up"},
+    {"axis": "y"},
+    {"axis": "θ", "theta": 30.0},
+    {"axis": "θφ", "theta": 30.0, "phi": 45.0},
+]
+
+def warm_up():
+    """Run one tiny simulation per mode; records each phase in the startup profile."""
+    if not WARM_UP:
+        profile.mark_ready()
+        return
+    try:
+        with profile.phase("warm_up_kernels"):
+            for options in ({}, {"mode": "multinomial"}, {"mode": "ensemble"},
+                            {"forget": True, "a": "1/sqrt(2)", "b": "i/sqrt(2)"},
+                            {"spin": 1}, {"spin": 1, "mode": "ensemble"}):
+                simulate_request(MeasurementRequest(analyzers=WARM_UP_ANALYZERS, atoms=64,
+                                                    **options))
+            sweep(SweepRequest(analyzers=WARM_UP_ANALYZERS[:2], atoms=64, sweep=1,
+                               theta_steps=3, phi_steps=3))
+        with profile.phase("warm_up_openapi"):
+            app.openapi()
+    except Exception as exc:
+        # A failed warm-up only means a slower first request
+        profile.mark_ready(error=repr(exc))
+        return
+    profile.mark_ready()
+
+Collected("spin_startup_seconds", "Seconds spent in each startup phase", "gauge",
+          lambda: {(phase,): seconds for phase, seconds in list(profile.phases.items())},
+          ("phase",))
+
+@app.get("/ready")
+def get_ready(response: Response):
+    """200 once the worker is warmed up, 503 before; includes the startup profile."""
+    if not profile.ready:
+        response.status_code = 503
+    return profile.as_dict()
@@ -0,0 +1,49 @@
+# startup.py – cold-start profile: time spent importing and warming up the server
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Durations of the named startup phases and whether warm-up has finished.
+
+    Created when this module is first imported, which main.py does before
+    anything else, so "total" is close to the time since the process began
+    loading the app.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.error = None
+        self._ready = threading.Event()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self, error: str = None):
+        self.error = error
+        self.phases["total"] = time.perf_counter() - self.started
+        self._ready.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "seconds": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "error": self.error,
+        }
+
+
+profile = StartupProfile()
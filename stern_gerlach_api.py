@@ -1,9 +1,9 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 import numpy as np
-import random
 from fastapi.middleware.cors import CORSMiddleware
-import re
+from expressions import parse_state
+from spin_engine import CHUNK_SIZE, analyzer_basis, fixed_states, measure_batch, random_states
 
 app = FastAPI()
 
@@ -16,62 +16,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Basis states ---
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-# --- Quantum functions ---
-def random_state():
-    a = np.random.randn() + 1j*np.random.randn()
-    b = np.random.randn() + 1j*np.random.randn()
-    vec = np.array([a, b], dtype=complex)
-    vec /= np.linalg.norm(vec)
-    return vec
-
-def measure_z(state):
-    prob_up = np.abs(np.vdot(Z_plus, state))**2
-    if random.random() < prob_up:
-        return Z_plus, "up"
-    else:
-        return Z_minus, "down"
-
-def measure_x(state):
-    prob_up = np.abs(np.vdot(X_plus, state))**2
-    if random.random() < prob_up:
-        return X_plus, "up"
-    else:
-        return X_minus, "down"
-
-def measure_y(state):
-    prob_up = np.abs(np.vdot(Y_plus, state))**2
-    if random.random() < prob_up:
-        return Y_plus, "up"
-    else:
-        return Y_minus, "down"
-
-def measure(state, axis):
-    if axis == "x":
-        return measure_x(state)
-    elif axis == "y":
-        return measure_y(state)
-    elif axis == "z":
-        return measure_z(state)
-    else:
-        raise ValueError("Invalid axis")
-
-# --- Convert calculator input to Python ---
-def convert_expression(expr: str) -> str:
-    if not expr:
-        return expr
-    expr = re.sub(r"√\(([^)]+)\)", r"(\1)**0.5", expr)
-    expr = expr.replace("^", "**")
-    expr = expr.replace("i", "j")
-    return expr
-
 # --- Request model ---
 class MeasurementRequest(BaseModel):
     axis1: str
@@ -86,35 +30,44 @@ class MeasurementRequest(BaseModel):
 def two_measurements(req: MeasurementRequest):
     first_up = first_down = second_up = second_down = 0
 
-    for _ in range(req.atoms):
-        # --- Determine initial state ---
-        if req.a and req.b:
-            try:
-                a_str = convert_expression(req.a)
-                b_str = convert_expression(req.b)
-                a = complex(eval(a_str))
-                b = complex(eval(b_str))
-                psi = np.array([a, b], dtype=complex)
-                psi /= np.linalg.norm(psi)
-            except Exception:
-                return {"error": "Invalid input. Use 1, 0.5, 1j, 0.5+0.5j, 1/2**0.5, √5, etc."}
+    # --- Parse manual state once ---
+    manual = None
+    if req.a and req.b:
+        try:
+            manual = parse_state(req.a, req.b)
+        except ValueError:
+            return {"error": "Invalid input. Use 1, 0.5, 1j, 0.5+0.5j, 1/2**0.5, √5, etc."}
+
+    up1, down1 = analyzer_basis(req.axis1)
+    up2, down2 = analyzer_basis(req.axis2)
+    rng = np.random.default_rng()
+
+    for done in range(0, req.atoms, CHUNK_SIZE):
+        n = min(CHUNK_SIZE, req.atoms - done)
+
+        # --- Determine initial states ---
+        if manual is not None:
+            psi = fixed_states(manual, n)
         else:
-            psi = random_state()
+            psi = random_states(n, rng)
 
         # --- First measurement ---
-        collapsed_state, outcome1 = measure(psi, req.axis1)
-        if outcome1 == "up":
-            first_up += 1
-        else:
-            first_down += 1
+        collapsed, is_up = measure_batch(psi, up1, down1, rng)
+        n_up = int(np.count_nonzero(is_up))
+        first_up += n_up
+        first_down += n - n_up
 
-        # --- Determine if second measurement is done ---
-        if req.filter_choice == "both" or outcome1 == req.filter_choice:
-            _, outcome2 = measure(collapsed_state, req.axis2)
-            if outcome2 == "up":
-                second_up += 1
-            else:
-                second_down += 1
+        # --- Only atoms passing the filter reach the second analyzer ---
+        if req.filter_choice == "up":
+            collapsed = collapsed[is_up]
+        elif req.filter_choice == "down":
+            collapsed = collapsed[~is_up]
+        elif req.filter_choice != "both":
+            continue
+        _, is_up = measure_batch(collapsed, up2, down2, rng)
+        n_up = int(np.count_nonzero(is_up))
+        second_up += n_up
+        second_down += len(is_up) - n_up
 
     return {
         "first_up": first_up,
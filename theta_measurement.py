@@ -1,54 +1,6 @@
-import numpy as np
-import random
 import tkinter as tk
+from spin_engine import Analyzer, simulate_chain
 
-# --- Basis states ---
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-
-X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-def theta_plus(theta):
-    """Eigenstate along theta in x-z plane"""
-    return np.array([np.cos(np.radians(theta)/2), np.sin(np.radians(theta)/2)], dtype=complex)
-
-def theta_minus(theta):
-    """Orthogonal state to theta_plus"""
-    return np.array([-np.sin(np.radians(theta)/2), np.cos(np.radians(theta)/2)], dtype=complex)
-
-
-def random_state():
-    a = np.random.randn() + 1j*np.random.randn()
-    b = np.random.randn() + 1j*np.random.randn()
-    vec = np.array([a, b], dtype=complex)
-    vec /= np.linalg.norm(vec)
-    return vec
-
-
-def measure_axis(state, axis, theta=None):
-    """Measure spin along chosen axis (x, y, z, or theta)."""
-    if axis == "z":
-        prob_up = np.abs(np.vdot(Z_plus, state))**2
-        return (Z_plus, "up") if random.random() < prob_up else (Z_minus, "down")
-    elif axis == "x":
-        prob_up = np.abs(np.vdot(X_plus, state))**2
-        return (X_plus, "up") if random.random() < prob_up else (X_minus, "down")
-    elif axis == "y":
-        prob_up = np.abs(np.vdot(Y_plus, state))**2
-        return (Y_plus, "up") if random.random() < prob_up else (Y_minus, "down")
-    elif axis == "θ":
-        if theta is None:
-            raise ValueError("Theta value must be provided for axis 'θ'.")
-        T_plus = theta_plus(theta)
-        T_minus = theta_minus(theta)
-        prob_up = np.abs(np.vdot(T_plus, state))**2
-        return (T_plus, "up") if random.random() < prob_up else (T_minus, "down")
-    else:
-        raise ValueError("Invalid axis. Choose x, y, z, or θ.")
 
 def run_two_measurements():
     axis1 = axis1_var.get()
@@ -63,23 +15,9 @@ def run_two_measurements():
     theta1 = int(entry_theta1.get()) if axis1 == "θ" else None
     theta2 = int(entry_theta2.get()) if axis2 == "θ" else None
 
-    first_up = first_down = second_up = second_down = 0
-
-    for _ in range(N):
-        psi = random_state()
-        collapsed_state, outcome1 = measure_axis(psi, axis1, theta1)
-
-        if outcome1 == "up":
-            first_up += 1
-        else:
-            first_down += 1
-
-        if outcome1 == filter_choice:
-            _, outcome2 = measure_axis(collapsed_state, axis2, theta2)
-            if outcome2 == "up":
-                second_up += 1
-            else:
-                second_down += 1
+    analyzers = [Analyzer(axis1, filter_choice, theta1), Analyzer(axis2, theta=theta2)]
+    second = simulate_chain(analyzers, N)[1]
+    second_up, second_down = second["up"], second["down"]
 
     result_label.config(
         text=f"Second measurement ({axis2.upper()})\n"
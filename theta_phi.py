@@ -1,56 +1,6 @@
-import numpy as np
-import random
 import tkinter as tk
+from spin_engine import Analyzer, simulate_chain
 
-# --- Spin basis states --- #
-Z_plus  = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-X_plus  = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-Y_plus  = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-# --- General θ, φ analyzer states --- #
-def theta_plus(theta_deg, phi_deg):
-    θ = np.radians(theta_deg)
-    φ = np.radians(phi_deg)
-    return np.array([
-        np.cos(θ/2),
-        np.exp(1j * φ) * np.sin(θ/2)
-    ], dtype=complex)
-
-def theta_minus(theta_deg, phi_deg):
-    θ = np.radians(theta_deg)
-    φ = np.radians(phi_deg)
-    return np.array([
-        -np.exp(-1j * φ) * np.sin(θ/2),
-        np.cos(θ/2)
-    ], dtype=complex)
-
-# --- Random normalized spin state --- #
-def random_state():
-    a, b = np.random.randn(2) + 1j*np.random.randn(2)
-    vec = np.array([a, b], dtype=complex)
-    return vec / np.linalg.norm(vec)
-
-# --- Generic measurement --- #
-def measure(state, axis, theta_val=0, phi_val=0):
-    if axis == "z":
-        up, down = Z_plus, Z_minus
-    elif axis == "x":
-        up, down = X_plus, X_minus
-    elif axis == "y":
-        up, down = Y_plus, Y_minus
-    elif axis == "θφ":
-        up, down = theta_plus(theta_val, phi_val), theta_minus(theta_val, phi_val)
-    else:
-        raise ValueError("Invalid axis")
-
-    p_up = np.abs(np.vdot(up, state))**2
-    if random.random() < p_up:
-        return up, "up"
-    else:
-        return down, "down"
 
 # --- Sequential measurement experiment --- #
 def run_two_measurements():
@@ -72,18 +22,9 @@ def run_two_measurements():
     except ValueError:
         θ, φ = 0, 0
 
-    up2 = down2 = passed = 0
-
-    for _ in range(N):
-        ψ = random_state()
-        collapsed, out1 = measure(ψ, axis1)
-        if out1 == filt:
-            passed += 1
-            _, out2 = measure(collapsed, axis2, θ, φ)
-            if out2 == "up":
-                up2 += 1
-            else:
-                down2 += 1
+    first, second = simulate_chain([Analyzer(axis1, filt), Analyzer(axis2, theta=θ, phi=φ)], N)
+    passed = first[filt]
+    up2, down2 = second["up"], second["down"]
 
     if passed == 0:
         result_label.config(text="No atoms passed the first filter!")
@@ -1,40 +1,7 @@
-import numpy as np
-import random
 import tkinter as tk
 
-# --- Basis states ---
-Z_plus = np.array([1, 0], dtype=complex)
-Z_minus = np.array([0, 1], dtype=complex)
-X_plus = (1/np.sqrt(2)) * np.array([1, 1], dtype=complex)
-X_minus = (1/np.sqrt(2)) * np.array([1, -1], dtype=complex)
-Y_plus = (1/np.sqrt(2)) * np.array([1, 1j], dtype=complex)
-Y_minus = (1/np.sqrt(2)) * np.array([1, -1j], dtype=complex)
-
-# --- Helper functions ---
-def random_state():
-    a = np.random.randn() + 1j*np.random.randn()
-    b = np.random.randn() + 1j*np.random.randn()
-    vec = np.array([a, b], dtype=complex)
-    vec /= np.linalg.norm(vec)
-    return vec
-
-def measure_z(state):
-    prob_up = np.abs(np.vdot(Z_plus, state))**2
-    return (Z_plus, "up") if random.random() < prob_up else (Z_minus, "down")
-
-def measure_x(state):
-    prob_up = np.abs(np.vdot(X_plus, state))**2
-    return (X_plus, "up") if random.random() < prob_up else (X_minus, "down")
-
-def measure_y(state):
-    prob_up = np.abs(np.vdot(Y_plus, state))**2
-    return (Y_plus, "up") if random.random() < prob_up else (Y_minus, "down")
-
-def measure(state, axis):
-    if axis == "z": return measure_z(state)
-    if axis == "x": return measure_x(state)
-    if axis == "y": return measure_y(state)
-    raise ValueError("Invalid axis. Choose x, y, or z.")
+from spin_engine import Analyzer, simulate_chain
+
 
 # --- Main simulation ---
 def run_three_measurements():
@@ -51,32 +18,12 @@ def run_three_measurements():
         result_label.config(text="Please enter a valid number of atoms.")
         return
 
-    second_up = second_down = 0
-    third_up = third_down = 0
-
-    for _ in range(N):
-        psi = random_state()
-        collapsed_state1, outcome1 = measure(psi, axis1)
-
-        # First filter
-        if filter1 == "both" or outcome1 == filter1:
-            collapsed_state2, outcome2 = measure(collapsed_state1, axis2)
-
-            # Second filter
-            if filter2 == "both" or outcome2 == filter2:
-                if outcome2 == "up":
-                    second_up += 1
-                else:
-                    second_down += 1
-
-                # Third analyzer
-                if forget:
-                    collapsed_state2 = random_state()
-                _, outcome3 = measure(collapsed_state2, axis3)
-                if outcome3 == "up":
-                    third_up += 1
-                else:
-                    third_down += 1
+    # The third analyzer counts every atom passing both filters;
+    # forgetting only happens before it
+    analyzers = [Analyzer(axis1, filter1), Analyzer(axis2, filter2), Analyzer(axis3)]
+    _, second, third = simulate_chain(analyzers, N, forget=[False, forget])
+    second_up, second_down = second["up"], second["down"]
+    third_up, third_down = third["up"], third["down"]
 
     forget_text = "(forgetting enabled)" if forget else ""
     result_label.config(